@@ -0,0 +1,112 @@
+import os
+import numpy as np
+import pandas as pd
+import transaction_store
+import transaction_schema
+
+# Month x Category x Kind aggregates of the categorized transactions, kept next to the store
+CUBE_FILE = "aggregates.parquet"
+
+KEYS = ["Month", "Category", "Kind"]
+CUBE_COLUMNS = KEYS + ["Sum", "Count", "Min", "Max"]
+
+def cube_path(root=transaction_store.STORE_ROOT):
+    return os.path.join(root, CUBE_FILE)
+
+def _empty_cube():
+    cube = pd.DataFrame(columns=CUBE_COLUMNS)
+    cube["Month"] = pd.PeriodIndex([], freq="M")
+    return cube.astype({"Sum": "float64", "Count": "int64", "Min": "float64", "Max": "float64"})
+
+def summarize(df):
+    # df: transactions with Date, Amount and Category, or the same in the compact schema
+    if df.empty:
+        return _empty_cube()
+    compact = df if "Cents" in df.columns else transaction_schema.to_compact(df[["Date", "Amount", "Category"]])
+    cells = compact.groupby(["MonthCode", "Category", "Income"], observed=True, sort=True)["Cents"].agg(
+        Sum="sum", Count="count", Min="min", Max="max"
+    ).reset_index()
+    return pd.DataFrame({
+        "Month": pd.PeriodIndex.from_ordinals(cells["MonthCode"].to_numpy(), freq="M"),
+        "Category": cells["Category"].astype(str),
+        "Kind": np.where(cells["Income"], "income", "expense"),
+        "Sum": cells["Sum"] / 100,
+        "Count": cells["Count"].astype("int64"),
+        "Min": cells["Min"] / 100,
+        "Max": cells["Max"] / 100,
+    }).sort_values(KEYS, ignore_index=True)
+
+def _merge(cube, cells):
+    combined = pd.concat([cube, cells], ignore_index=True)
+    return combined.groupby(KEYS, sort=True).agg(
+        Sum=("Sum", "sum"), Count=("Count", "sum"), Min=("Min", "min"), Max=("Max", "max")
+    ).reset_index()
+
+def save_cube(cube, root=transaction_store.STORE_ROOT):
+    os.makedirs(root, exist_ok=True)
+    cube.assign(Month=cube["Month"].astype(str)).to_parquet(cube_path(root), index=False)
+    return cube
+
+def load_cube(root=transaction_store.STORE_ROOT):
+    path = cube_path(root)
+    if not os.path.exists(path):
+        if not transaction_store.has_dataset(transaction_store.CATEGORIZED, root):
+            return _empty_cube()
+        return rebuild_cube(root)
+    cube = pd.read_parquet(path)
+    cube["Month"] = pd.PeriodIndex(cube["Month"], freq="M")
+    return cube
+
+def rebuild_cube(root=transaction_store.STORE_ROOT):
+    compact = transaction_schema.read_compact(columns=["Date", "Amount", "Category"], root=root)
+    return save_cube(summarize(compact), root)
+
+def write_cube(df, root=transaction_store.STORE_ROOT):
+    # df holds the complete categorized history
+    return save_cube(summarize(df), root)
+
+def replace_months(df, root=transaction_store.STORE_ROOT):
+    # df holds every transaction of the months it covers; only those cells are recomputed
+    cells = summarize(df)
+    cube = load_cube(root)
+    cube = cube[~cube["Month"].isin(cells["Month"].unique())]
+    return save_cube(pd.concat([cube, cells], ignore_index=True).sort_values(KEYS, ignore_index=True), root)
+
+def add_transactions(df, root=transaction_store.STORE_ROOT):
+    # df holds newly appended transactions; their cells are merged into the existing totals.
+    # Without a cube file the store, which already holds df, is summarized instead of merged into.
+    if not os.path.exists(cube_path(root)):
+        return rebuild_cube(root)
+    return save_cube(_merge(load_cube(root), summarize(df)), root)
+
+def monthly_spending(cube):
+    expenses = cube[cube["Kind"] == "expense"]
+    return expenses[["Month", "Category", "Sum"]].rename(columns={"Sum": "Amount"}).reset_index(drop=True)
+
+def monthly_income(cube):
+    income = cube[cube["Kind"] == "income"]
+    return income.groupby("Month")["Sum"].sum().rename("Amount").reset_index()
+
+def category_totals(cube, start=None, end=None):
+    expenses = cube[cube["Kind"] == "expense"]
+    if start is not None:
+        expenses = expenses[expenses["Month"] >= start]
+    if end is not None:
+        expenses = expenses[expenses["Month"] <= end]
+    return expenses.groupby("Category")["Sum"].sum().rename("Amount")
+
+def monthly_totals(cube):
+    # Total spending per calendar month, with months without spending filled as 0
+    totals = monthly_spending(cube).groupby("Month")["Amount"].sum()
+    if totals.empty:
+        return totals
+    months = pd.period_range(totals.index.min(), totals.index.max(), freq="M")
+    totals = totals.reindex(months, fill_value=0)
+    totals.index = totals.index.to_timestamp(how="end").normalize()
+    return totals
+
+def categories(cube):
+    return cube["Category"].unique()
+
+def years(cube):
+    return sorted(cube["Month"].dt.year.unique())
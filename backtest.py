@@ -0,0 +1,129 @@
+import time
+import argparse
+import itertools
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from predict_expenses import HYPERPARAMETERS, monthly_expense_series
+from batch_forecast import expense_series, recursive_forecast, synthetic_series, to_matrix
+
+HORIZON = HYPERPARAMETERS["horizon"]
+MIN_WINDOWS = 3
+
+GRID = {
+    "lags": [1, 2, 3, 4],
+    "n_estimators": [50, 100, 200],
+    "learning_rate": [0.05, 0.1, 0.3],
+}
+
+_matrix = None
+
+def _init_worker(matrix):
+    global _matrix
+    _matrix = matrix
+    _lag_windows.cache_clear()
+
+@lru_cache(maxsize=None)
+def _lag_windows(lags):
+    # Built once per worker and lag count, then sliced for every fold and model setting.
+    # Features are unscaled; each fold divides by its own training means.
+    windows = sliding_window_view(_matrix, lags + 1, axis=1)
+    return windows[:, :, lags - 1::-1], windows[:, :, lags]
+
+def _fold(config, cutoff):
+    import xgboost as xgb
+
+    lags = config["lags"]
+    X, y = _lag_windows(lags)
+    # Window w predicts month w + lags, so the first cutoff - lags windows only see the past
+    train_windows = cutoff - lags
+    scale = _matrix[:, :cutoff].mean(axis=1)
+    scale[scale == 0] = 1
+
+    X_train = (X[:, :train_windows] / scale[:, None, None]).reshape(-1, lags)
+    y_train = (y[:, :train_windows] / scale[:, None]).reshape(-1)
+
+    start = time.perf_counter()
+    model = xgb.XGBRegressor(objective="reg:squarederror", n_estimators=config["n_estimators"], learning_rate=config["learning_rate"])
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    horizon = min(HORIZON, _matrix.shape[1] - cutoff)
+    forecast = recursive_forecast(model, _matrix[:, :cutoff] / scale[:, None], lags, horizon) * scale[:, None]
+    predict_time = time.perf_counter() - start
+
+    actual = _matrix[:, cutoff:cutoff + horizon]
+    errors = forecast - actual
+    nonzero = actual != 0
+    return {
+        **config,
+        "Cutoff": cutoff,
+        "MAE": np.abs(errors).mean(),
+        "RMSE": np.sqrt((errors ** 2).mean()),
+        "MAPE": np.abs(errors[nonzero] / actual[nonzero]).mean() if nonzero.any() else np.nan,
+        "Fit (s)": fit_time,
+        "Predict (s)": predict_time,
+    }
+
+def _run_config(config, cutoffs):
+    return [_fold(config, cutoff) for cutoff in cutoffs]
+
+def configurations(grid=GRID):
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+def backtest(matrix, grid=GRID, workers=None, min_windows=MIN_WINDOWS):
+    # Every configuration is scored on the same cutoffs, so results compare like with like
+    months = matrix.shape[1]
+    cutoffs = list(range(max(grid["lags"]) + min_windows, months - HORIZON + 1))
+    if not cutoffs:
+        raise ValueError(f"❌ Error: Not enough data for backtesting. At least {max(grid['lags']) + min_windows + HORIZON} months required.")
+
+    configs = configurations(grid)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(matrix,)) as executor:
+        folds = pd.DataFrame([row for rows in executor.map(_run_config, configs, itertools.repeat(cutoffs)) for row in rows])
+
+    keys = list(grid)
+    results = folds.groupby(keys).agg(
+        Folds=("Cutoff", "count"),
+        MAE=("MAE", "mean"),
+        MAE_std=("MAE", "std"),
+        RMSE=("RMSE", "mean"),
+        MAPE=("MAPE", "mean"),
+        Fit_s=("Fit (s)", "mean"),
+        Predict_s=("Predict (s)", "mean"),
+    ).reset_index().sort_values("MAE", ignore_index=True)
+    return results.rename(columns={"MAE_std": "MAE std", "Fit_s": "Fit (s)", "Predict_s": "Predict (s)"}), folds
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the expense forecaster over a grid of settings.")
+    parser.add_argument("--series", choices=["total", "categories", "synthetic"], default="total",
+                        help="the total monthly expenses, every category series, or generated series")
+    parser.add_argument("--synthetic-series", type=int, default=50)
+    parser.add_argument("--lags", type=int, nargs="+", default=GRID["lags"])
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=GRID["n_estimators"])
+    parser.add_argument("--learning-rate", type=float, nargs="+", default=GRID["learning_rate"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="backtest_results.csv")
+    args = parser.parse_args()
+
+    if args.series == "total":
+        matrix = monthly_expense_series()["Expense"].to_numpy(dtype="float64")[None, :]
+    else:
+        series = expense_series() if args.series == "categories" else synthetic_series(args.synthetic_series)
+        matrix = to_matrix(series)[0]
+
+    grid = {"lags": args.lags, "n_estimators": args.n_estimators, "learning_rate": args.learning_rate}
+    start = time.perf_counter()
+    results, folds = backtest(matrix, grid, args.workers)
+    elapsed = time.perf_counter() - start
+
+    results.to_csv(args.output, index=False)
+    print(results.round(4).to_string(index=False))
+    print(f"✅ Backtested {len(results)} configurations over {folds['Cutoff'].nunique()} cutoffs "
+          f"and {len(matrix)} series in {elapsed:.1f}s; saved to '{args.output}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+import transaction_store
+import transaction_schema
+from predict_expenses import HYPERPARAMETERS, train_forecast
+
+def expense_series(root=transaction_store.STORE_ROOT, prefix=""):
+    # Long frame of monthly expenses per category: Series, Month, Expense
+    if not transaction_store.has_dataset(transaction_store.CATEGORIZED, root):
+        raise FileNotFoundError("❌ Error: Categorized transactions not found! Run 'categorize_expenses.py' first.")
+    compact = transaction_schema.read_compact(columns=["Date", "Amount", "Category"], root=root)
+    compact = compact[compact["Cents"] < 0]
+    cents = compact.groupby(["Category", "MonthCode"], observed=True)["Cents"].sum().reset_index()
+    return pd.DataFrame({
+        "Series": prefix + cents["Category"].astype(str),
+        "Month": pd.PeriodIndex.from_ordinals(cents["MonthCode"].to_numpy(), freq="M"),
+        "Expense": np.abs(cents["Cents"].to_numpy()) / 100,
+    })
+
+def account_series(accounts_dir):
+    from pipeline_runner import list_accounts
+
+    return pd.concat([
+        expense_series(os.path.join(accounts_dir, account, transaction_store.STORE_ROOT), f"{account}/")
+        for account in list_accounts(accounts_dir)
+    ], ignore_index=True)
+
+def to_matrix(series):
+    # One row per series over a shared month range; months without spending are 0
+    months = pd.period_range(series["Month"].min(), series["Month"].max(), freq="M")
+    matrix = series.pivot_table(index="Series", columns="Month", values="Expense", aggfunc="sum", fill_value=0)
+    matrix = matrix.reindex(columns=months, fill_value=0)
+    return matrix.to_numpy(dtype="float64"), matrix.index.to_numpy(), months
+
+def lag_features(matrix, lags):
+    # Every (series, month) window at once: lag_1 ... lag_n as features, the month itself as target
+    windows = sliding_window_view(matrix, lags + 1, axis=1)
+    X = windows[:, :, lags - 1::-1].reshape(-1, lags)
+    y = windows[:, :, lags].reshape(-1)
+    return X, y
+
+def fit_global(matrix, params=HYPERPARAMETERS):
+    import xgboost as xgb
+
+    X, y = lag_features(matrix, params["lags"])
+    model = xgb.XGBRegressor(objective="reg:squarederror", n_estimators=params["n_estimators"], learning_rate=params["learning_rate"])
+    model.fit(X, y)
+    return model
+
+def recursive_forecast(model, matrix, lags, horizon):
+    # One predict call per step for all series together
+    last_known = matrix[:, :-lags - 1:-1]
+    forecasts = np.empty((len(matrix), horizon))
+    for step in range(horizon):
+        forecasts[:, step] = model.predict(last_known)
+        last_known = np.column_stack([forecasts[:, step], last_known[:, :-1]])
+    return forecasts
+
+def _scale(matrix):
+    # Series are brought to a common scale so one model can learn their shared shape
+    scale = matrix.mean(axis=1, keepdims=True)
+    scale[scale == 0] = 1
+    return scale
+
+def forecast_all(series, params=HYPERPARAMETERS):
+    lags, horizon = params["lags"], params["horizon"]
+    matrix, labels, months = to_matrix(series)
+    if matrix.shape[1] < lags + horizon + 1:
+        raise ValueError(f"❌ Error: Not enough data for ML forecasting. At least {lags + horizon + 1} months of data required.")
+
+    # Holdout error per series from a model, and a scale, that have not seen the last months
+    history = matrix[:, :-horizon]
+    history_scale = _scale(history)
+    holdout = recursive_forecast(fit_global(history / history_scale, params), history / history_scale, lags, horizon) * history_scale
+    mae = np.abs(holdout - matrix[:, -horizon:]).mean(axis=1)
+
+    scale = _scale(matrix)
+    scaled = matrix / scale
+    future = recursive_forecast(fit_global(scaled, params), scaled, lags, horizon) * scale
+    future_months = pd.period_range(months[-1] + 1, periods=horizon, freq="M")
+    forecasts = pd.DataFrame(future, index=pd.Index(labels, name="Series"), columns=future_months.strftime("%m-%Y"))
+    forecasts["MAE"] = mae
+    return forecasts
+
+def synthetic_series(n_series, n_months=36, seed=0):
+    rng = np.random.default_rng(seed)
+    months = pd.period_range("2022-01", periods=n_months, freq="M")
+    level = rng.lognormal(5, 1, (n_series, 1))
+    season = 1 + 0.2 * np.sin(2 * np.pi * (np.arange(n_months) + rng.integers(0, 12, (n_series, 1))) / 12)
+    values = level * season * rng.normal(1, 0.1, (n_series, n_months))
+    return pd.DataFrame({
+        "Series": np.repeat([f"series_{i}" for i in range(n_series)], n_months),
+        "Month": np.tile(months, n_series),
+        "Expense": values.reshape(-1),
+    })
+
+def benchmark(n_series=(10, 100, 1000), loop_limit=100, params=HYPERPARAMETERS):
+    # The per-series loop is timed on at most loop_limit series and scaled up linearly
+    import xgboost  # import cost is not part of either timing
+
+    rows = []
+    for count in n_series:
+        series = synthetic_series(count)
+
+        start = time.perf_counter()
+        forecast_all(series, params)
+        batched = time.perf_counter() - start
+
+        looped_series = min(count, loop_limit)
+        start = time.perf_counter()
+        for _, group in series[series["Series"].isin(series["Series"].unique()[:looped_series])].groupby("Series"):
+            monthly = group.set_index(group["Month"].dt.to_timestamp(how="end").dt.normalize())[["Expense"]]
+            train_forecast(monthly, params)
+        looped = (time.perf_counter() - start) * count / looped_series
+
+        rows.append({"Series": count, "Batched (s)": batched, "Per-series loop (s)": looped, "Speedup": looped / batched})
+    results = pd.DataFrame(rows)
+    print(results.round(3).to_string(index=False))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="3-month expense forecasts for every category (and account) with one global model.")
+    commands = parser.add_subparsers(dest="command")
+    run_parser = commands.add_parser("run", help="forecast every category series (default)")
+    run_parser.add_argument("--accounts-dir", help="forecast every account/category under this 'pipeline_runner.py' directory")
+    run_parser.add_argument("--output", default="category_forecasts.csv")
+    benchmark_parser = commands.add_parser("benchmark", help="compare with looping 'predict_expenses.train_forecast' per series")
+    benchmark_parser.add_argument("--series", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark(args.series)
+        return
+
+    accounts_dir = getattr(args, "accounts_dir", None)
+    output = getattr(args, "output", "category_forecasts.csv")
+    series = account_series(accounts_dir) if accounts_dir else expense_series()
+    forecasts = forecast_all(series)
+    forecasts.to_csv(output)
+    print(forecasts.round(2).to_string())
+    print(f"✅ Forecast {len(forecasts)} series; saved to '{output}'")
+
+if __name__ == "__main__":
+    main()
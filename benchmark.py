@@ -0,0 +1,209 @@
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import pandas as pd
+import synthetic_data
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Linked into every benchmark directory so the scripts find them at their usual relative paths
+ARTIFACTS = ["transaction_classifier.pkl", "vectorizer.pkl", "online_classifier.joblib", "categories.json", "fraud_rules.json"]
+
+SIZES = [10000, 100000, 1000000, 10000000]
+# Share of the newest months removed from the store before 'categorize_incremental', so it has new rows to add
+INCREMENTAL_NEW_SHARE = 0.1
+
+PIPELINE_STAGES = ["categorize", "categorize_incremental", "cube_rebuild", "fraud_fit", "fraud_run", "forecast", "batch_forecast"]
+COMPONENT_STAGES = [
+    "display_income_and_spending", "display_budget_analysis", "display_spending_vs_budget",
+    "compare_spending_between_months", "display_category_wise_spending", "display_spending_trends",
+    "display_category_comparison",
+]
+STAGES = PIPELINE_STAGES + COMPONENT_STAGES
+
+def _preload():
+    # Import and artifact load costs belong to 'startup_report.py', not to the stage timings
+    import xgboost
+    import matplotlib.figure
+    import matplotlib.pyplot
+    import sklearn.ensemble
+    import categorize_expenses
+
+    categorize_expenses.load_artifacts()
+
+def _component(name):
+    # Component functions run outside a Streamlit server, where every widget returns its default
+    import importlib
+    import aggregate_cube
+    from budget_index import BudgetIndex
+    from period_index import MonthIndex
+
+    cube = aggregate_cube.load_cube()
+    spending_index = MonthIndex(aggregate_cube.monthly_spending(cube))
+    income_index = MonthIndex(aggregate_cube.monthly_income(cube), category=None)
+    budgets = BudgetIndex.from_csv("budgets.csv")
+    period = cube["Month"].max()
+
+    arguments = {
+        "display_income_and_spending": (income_index, spending_index, period),
+        "display_budget_analysis": (spending_index, period, budgets),
+        "display_spending_vs_budget": (spending_index, period.year, period.month, budgets),
+        "compare_spending_between_months": (spending_index,),
+        "display_category_wise_spending": (cube, spending_index, budgets),
+        "display_spending_trends": (cube,),
+        "display_category_comparison": (cube, spending_index, budgets),
+    }[name]
+    function = getattr(importlib.import_module(f"components.{name}"), name)
+    return lambda: function(*arguments)
+
+def stage_function(name):
+    # Returns (setup, run); setup puts the directory back into the state run expects
+    import categorize_expenses
+    import fraud_detection
+    import fraud_features
+    import predict_expenses
+    import batch_forecast
+    import aggregate_cube
+    import transaction_store
+
+    def no_setup():
+        pass
+
+    def clear_feature_state():
+        shutil.rmtree(fraud_features.feature_dir(), ignore_errors=True)
+
+    def clear_category_cache():
+        if os.path.exists("category_cache.json"):
+            os.remove("category_cache.json")
+
+    def drop_newest_months():
+        months = transaction_store.list_months(transaction_store.CATEGORIZED)
+        for month in months[-max(1, round(len(months) * INCREMENTAL_NEW_SHARE)):]:
+            shutil.rmtree(transaction_store.partition_path(transaction_store.CATEGORIZED, month))
+        aggregate_cube.rebuild_cube()
+
+    stages = {
+        "categorize": (clear_category_cache, categorize_expenses.categorize_all),
+        "categorize_incremental": (drop_newest_months, lambda: categorize_expenses.categorize_incremental(workers=1)),
+        "cube_rebuild": (no_setup, aggregate_cube.rebuild_cube),
+        "fraud_fit": (clear_feature_state, lambda: fraud_detection.fit(workers=1)),
+        "fraud_run": (no_setup, lambda: fraud_detection.run(workers=1)),
+        "forecast": (no_setup, predict_expenses.run_expense_prediction),
+        "batch_forecast": (no_setup, lambda: batch_forecast.forecast_all(batch_forecast.expense_series())),
+    }
+    if name in stages:
+        return stages[name]
+    from components.chart_render import _cache as chart_cache
+    return chart_cache.clear, _component(name)
+
+def measure(name):
+    # Timed once without tracing, then once more under tracemalloc for the peak
+    _preload()
+    setup, run = stage_function(name)
+    setup()
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    setup()
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"Seconds": seconds, "Peak (MB)": peak / 2 ** 20}
+
+def measure_in_subprocess(name, directory):
+    result = subprocess.run(
+        [sys.executable, os.path.join(REPO_DIR, "benchmark.py"), "--stage", name],
+        cwd=directory, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": REPO_DIR, "PYTHONWARNINGS": "ignore"},
+    )
+    lines = [line for line in result.stdout.splitlines() if line.startswith("BENCHMARK ")]
+    if result.returncode != 0 or not lines:
+        error = result.stderr.strip().splitlines()
+        return {"Seconds": None, "Peak (MB)": None, "Error": error[-1] if error else f"exit code {result.returncode}"}
+    return json.loads(lines[-1][len("BENCHMARK "):])
+
+def prepare_directory(rows, years, seed):
+    directory = tempfile.mkdtemp(prefix=f"benchmark_{rows}_")
+    synthetic_data.write_dataset(directory, rows, years=years, seed=seed)
+    for artifact in ARTIFACTS:
+        source = os.path.join(REPO_DIR, artifact)
+        if os.path.exists(source):
+            os.symlink(source, os.path.join(directory, artifact))
+    return directory
+
+def run_suite(sizes=SIZES, stages=STAGES, years=2, seed=0, keep=False):
+    rows = []
+    for size in sizes:
+        directory = prepare_directory(size, years, seed)
+        try:
+            # Stages run in order; later ones read what earlier ones wrote
+            for stage in stages:
+                result = measure_in_subprocess(stage, directory)
+                rows.append({"Rows": size, "Stage": stage, **result})
+                seconds = f"{result['Seconds']:.3f}s" if result["Seconds"] is not None else result["Error"]
+                print(f"⏱ {size:>9} rows  {stage:<34} {seconds}", flush=True)
+        finally:
+            if keep:
+                print(f"📁 Kept '{directory}'")
+            else:
+                shutil.rmtree(directory)
+    return pd.DataFrame(rows)
+
+def compare(results, baseline, tolerance):
+    # Time or memory growth beyond tolerance against a baseline saved with --save
+    merged = results.merge(pd.DataFrame(baseline), on=["Rows", "Stage"], suffixes=("", " (base)"))
+    merged["Time ratio"] = merged["Seconds"] / merged["Seconds (base)"]
+    merged["Memory ratio"] = merged["Peak (MB)"] / merged["Peak (MB) (base)"]
+    regressions = merged[(merged["Time ratio"] > 1 + tolerance) | (merged["Memory ratio"] > 1 + tolerance)]
+    return merged, [
+        f"{row['Stage']} @ {row['Rows']} rows: {row['Seconds (base)']:.3f}s -> {row['Seconds']:.3f}s, "
+        f"{row['Peak (MB) (base)']:.1f}MB -> {row['Peak (MB)']:.1f}MB"
+        for _, row in regressions.iterrows()
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and peak memory of every pipeline stage and dashboard component on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the generated directories")
+    parser.add_argument("--save", help="write the results as a baseline JSON file")
+    parser.add_argument("--baseline", help="compare with a baseline written earlier with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed growth in time or memory against the baseline")
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        # One stage in the current directory; run_suite starts these in fresh processes
+        print("BENCHMARK " + json.dumps(measure(args.stage)), flush=True)
+        return
+
+    results = run_suite(args.sizes, args.stages, args.years, args.seed, args.keep)
+    print(results.round(3).to_string(index=False))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results.to_dict(orient="records"), f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            merged, regressions = compare(results, json.load(f), args.tolerance)
+        print(merged[["Rows", "Stage", "Time ratio", "Memory ratio"]].round(2).to_string(index=False))
+        if regressions:
+            print("⚠ Benchmark regressions:\n" + "\n".join(regressions))
+            sys.exit(1)
+        print("✅ No benchmark regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import bisect
+import pandas as pd
+import instrumentation
+from period_index import month_ordinal
+
+class BudgetIndex:
+    # Budgets keyed by (month, category) with a sorted month list per category for range queries
+    def __init__(self, budget_df):
+        self._budgets = {}
+        self._months = {}
+        self._frame = None
+        months = pd.PeriodIndex(budget_df["Month"], freq="M")
+        for month, category, budget in zip(months.asi8, budget_df["Category"], budget_df["Budget"]):
+            self._store(int(month), category, budget)
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(pd.read_csv(path))
+
+    def _store(self, ordinal, category, budget):
+        key = (ordinal, category)
+        if key not in self._budgets:
+            bisect.insort(self._months.setdefault(category, []), ordinal)
+        self._budgets[key] = budget
+        self._frame = None
+
+    def get(self, month, category, default=None):
+        return self._budgets.get((month_ordinal(month), category), default)
+
+    def set(self, month, category, budget):
+        self._store(month_ordinal(month), category, budget)
+
+    def range(self, category, start, end):
+        months = self._months.get(category, [])
+        lo = bisect.bisect_left(months, month_ordinal(start))
+        hi = bisect.bisect_right(months, month_ordinal(end))
+        return [
+            (pd.Period(ordinal=ordinal, freq="M"), self._budgets[(ordinal, category)])
+            for ordinal in months[lo:hi]
+        ]
+
+    def categories(self):
+        return list(self._months)
+
+    def to_frame(self):
+        if self._frame is None:
+            ordinals = [ordinal for ordinal, _ in self._budgets]
+            self._frame = pd.DataFrame({
+                "Month": pd.PeriodIndex.from_ordinals(ordinals, freq="M"),
+                "Category": [category for _, category in self._budgets],
+                "Budget": list(self._budgets.values()),
+            })
+        return self._frame
+
+    def save(self, path):
+        self.to_frame().to_csv(path, index=False)
+
+    def __len__(self):
+        return len(self._budgets)
+
+@instrumentation.instrument("budget_vs_actual")
+def budget_vs_actual(spending, budgets, month=None):
+    # Join spending (Category, Amount and Month unless month is given) with the budget of each cell
+    if month is not None:
+        spending = spending.assign(Month=pd.Period(month, freq="M"))
+    joined = spending[["Month", "Category", "Amount"]].merge(
+        budgets.to_frame(), on=["Month", "Category"], how="left"
+    )
+    joined["Spent"] = joined["Amount"].abs()
+    joined["Over Budget"] = (joined["Spent"] - joined["Budget"].fillna(0)).clip(lower=0)
+    return joined.drop(columns="Amount")
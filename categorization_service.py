@@ -0,0 +1,169 @@
+import json
+import time
+import queue
+import signal
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import request as urlrequest
+import numpy as np
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+class MicroBatcher:
+    # Coalesces concurrent requests into one categorize() call per time window
+    def __init__(self, categorize, window=0.005, max_batch=4096):
+        self.categorize = categorize
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._latencies = deque(maxlen=10000)
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.items = 0
+        self.batches = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, descriptions):
+        future = Future()
+        self._queue.put((time.perf_counter(), list(descriptions), future))
+        return future
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        size = len(pending[0][1])
+        deadline = time.perf_counter() + self.window
+        while size < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+            size += len(pending[-1][1])
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            descriptions = [description for _, batch, _ in pending for description in batch]
+            try:
+                categories = list(self.categorize(descriptions))
+            except Exception as error:
+                for _, _, future in pending:
+                    future.set_exception(error)
+                continue
+
+            done = time.perf_counter()
+            offset = 0
+            with self._lock:
+                for submitted, batch, future in pending:
+                    future.set_result(categories[offset:offset + len(batch)])
+                    offset += len(batch)
+                    self._latencies.append(done - submitted)
+                self.requests += len(pending)
+                self.items += len(descriptions)
+                self.batches += 1
+
+    def stats(self):
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            uptime = time.perf_counter() - self.started
+            return {
+                "requests": self.requests,
+                "items": self.items,
+                "batches": self.batches,
+                "mean_batch_size": self.items / self.batches if self.batches else 0,
+                "items_per_second": self.items / uptime if uptime else 0,
+                "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            }
+
+def make_handler(batcher):
+    class CategorizationHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._reply(200, batcher.stats())
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/categorize":
+                self._reply(404, {"error": "not found"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                descriptions = payload["descriptions"] if "descriptions" in payload else [payload["description"]]
+                # A string for 'descriptions' would otherwise be split into characters
+                if not isinstance(descriptions, list) or not all(isinstance(description, str) for description in descriptions):
+                    raise TypeError("descriptions must be a list of strings")
+            except (ValueError, KeyError, TypeError):
+                self._reply(400, {"error": "expected JSON with a 'description' string or a 'descriptions' list of strings"})
+                return
+            try:
+                categories = batcher.submit(descriptions).result()
+            except Exception as error:
+                self._reply(500, {"error": str(error)})
+                return
+            self._reply(200, {"categories": [str(category) for category in categories]})
+
+        def log_message(self, format, *args):
+            pass
+
+    return CategorizationHandler
+
+def categorize_remote(descriptions, url=DEFAULT_URL, batch_size=5000):
+    categories = []
+    descriptions = [str(description) for description in descriptions]
+    for start in range(0, len(descriptions), batch_size):
+        body = json.dumps({"descriptions": descriptions[start:start + batch_size]}).encode()
+        req = urlrequest.Request(f"{url}/categorize", data=body, headers={"Content-Type": "application/json"})
+        with urlrequest.urlopen(req) as response:
+            categories.extend(json.loads(response.read())["categories"])
+    return np.array(categories, dtype=object)
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+def serve(host="127.0.0.1", port=8765, backend="forest", window=0.005, max_batch=4096):
+    from categorize_expenses import load_artifacts, make_categorizer
+
+    load_artifacts(backend)
+    categorizer = make_categorizer(backend=backend)
+    batcher = MicroBatcher(categorizer.categorize, window, max_batch)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    print(f"✅ Categorization service listening on http://{host}:{port}", flush=True)
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        categorizer.save()
+        print(f"📊 {json.dumps(batcher.stats())}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Local categorization server that keeps the model warm.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--backend", choices=["forest", "online"], default="forest")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="how long to wait for more requests before predicting")
+    parser.add_argument("--max-batch", type=int, default=4096)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.backend, args.window_ms / 1000, args.max_batch)
+
+if __name__ == "__main__":
+    main()
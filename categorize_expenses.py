@@ -1,26 +1,175 @@
 import os
+import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import joblib
+import numpy as np
 import pandas as pd
+import transaction_store
+import aggregate_cube
+import instrumentation
+import online_classifier
+from categorizer import Categorizer
+from categorization_service import DEFAULT_URL, categorize_remote
 
-if not os.path.exists("transactions.csv"):
-    raise FileNotFoundError("❌ Error: 'transactions.csv' not found!")
+TRANSACTIONS_FILE = "transactions.csv"
+MODEL_FILE = "transaction_classifier.pkl"
+VECTORIZER_FILE = "vectorizer.pkl"
 
-if not os.path.exists("transaction_classifier.pkl") or not os.path.exists("vectorizer.pkl"):
-    raise FileNotFoundError("❌ Error: Classifier model or vectorizer missing! Run 'train_classifier.py' first.")
+BACKENDS = ["forest", "online"]
 
-model = joblib.load("transaction_classifier.pkl")
-vectorizer = joblib.load("vectorizer.pkl")
+# One loaded predictor per backend, so a process can serve both
+_predictors = {}
 
-df = pd.read_csv("transactions.csv")
+def model_files(backend="forest"):
+    if backend == "online":
+        return (online_classifier.MODEL_FILE,)
+    return (MODEL_FILE, VECTORIZER_FILE)
 
-X_test = vectorizer.transform(df["Description"])
-df["Category"] = model.predict(X_test)
+def load_artifacts(backend="forest"):
+    if backend not in _predictors:
+        if backend == "online":
+            _predictors[backend] = online_classifier.OnlineClassifier.load().predict
+        else:
+            if not os.path.exists(MODEL_FILE) or not os.path.exists(VECTORIZER_FILE):
+                raise FileNotFoundError("❌ Error: Classifier model or vectorizer missing! Run 'train_classifier.py' first.")
+            model = joblib.load(MODEL_FILE)
+            vectorizer = joblib.load(VECTORIZER_FILE)
+            _predictors[backend] = lambda descriptions: model.predict(vectorizer.transform(descriptions))
+    return _predictors[backend]
 
-unknown_categories = df[df["Category"].isna()]
-if not unknown_categories.empty:
-    print("⚠ Warning: Some transactions could not be categorized. Review them manually.")
-    print(unknown_categories)
-df["Category"] = df["Category"].fillna("Uncategorized")
+def predict_categories(descriptions, backend="forest"):
+    return load_artifacts(backend)(descriptions)
 
-df.to_csv("categorized_transactions.csv", index=False)
-print("✅ Categorization complete! Saved to 'categorized_transactions.csv'")
+def make_categorizer(predict=None, use_cache=True, backend="forest", service=None):
+    predict = predict or functools.partial(predict_categories, backend=backend)
+    if service:
+        # The service keeps its own cache, rules and warm model
+        return Categorizer(lambda descriptions: categorize_remote(descriptions, service), rules_file=None, cache_file=None)
+    if not use_cache:
+        return Categorizer(predict, rules_file=None, cache_file=None)
+    return Categorizer(predict, model_files=model_files(backend))
+
+def finalize_categories(df):
+    unknown_categories = df[df["Category"].isna()]
+    if not unknown_categories.empty:
+        print("⚠ Warning: Some transactions could not be categorized. Review them manually.")
+        print(unknown_categories)
+    df["Category"] = df["Category"].fillna("Uncategorized")
+    return df
+
+def categorize_all(use_cache=True, backend="forest", service=None):
+    if not service:
+        with instrumentation.stage("load_artifacts"):
+            load_artifacts(backend)
+    with instrumentation.stage("read_transactions") as record:
+        df = pd.read_csv(TRANSACTIONS_FILE)
+        record["rows"] = len(df)
+
+    with instrumentation.stage("categorize", rows=len(df)):
+        categorizer = make_categorizer(use_cache=use_cache, backend=backend, service=service)
+        df["Category"] = categorizer.categorize(df["Description"])
+        categorizer.save()
+    print(categorizer.report())
+    df = finalize_categories(df)
+
+    with instrumentation.stage("write_store", rows=len(df)):
+        df[transaction_store.FINGERPRINT] = transaction_store.fingerprint_transactions(df)
+        transaction_store.write_transactions(df, transaction_store.CATEGORIZED)
+    with instrumentation.stage("write_cube", rows=len(df)):
+        aggregate_cube.write_cube(df)
+    print(f"✅ Categorization complete! Saved to '{transaction_store.dataset_path(transaction_store.CATEGORIZED)}'")
+
+def _predict_parallel(executor, descriptions, workers, backend="forest"):
+    predict = functools.partial(predict_categories, backend=backend)
+    if executor is None or len(descriptions) < 2 * workers:
+        return predict(descriptions)
+    batches = np.array_split(np.asarray(descriptions, dtype=object), workers)
+    return np.concatenate(list(executor.map(predict, batches)))
+
+def _last_rows(path, chunk_size):
+    # Row number of the last transaction of each month, from a pass over the Date column only
+    last_rows = {}
+    offset = 0
+    for chunk in pd.read_csv(path, usecols=["Date"], chunksize=chunk_size):
+        months = pd.to_datetime(chunk["Date"]).dt.to_period("M")
+        positions = pd.Series(np.arange(offset, offset + len(chunk)), index=months.to_numpy())
+        for month, row in positions.groupby(level=0).max().items():
+            last_rows[month] = max(last_rows.get(month, -1), row)
+        offset += len(chunk)
+    return last_rows
+
+def categorize_incremental(chunk_size=50000, workers=os.cpu_count(), use_cache=True, backend="forest", service=None):
+    if service:
+        workers = 1
+    else:
+        load_artifacts(backend)
+    known = pd.Index(np.array([], dtype="uint64"))
+    if transaction_store.has_dataset(transaction_store.CATEGORIZED):
+        known = pd.Index(np.unique(transaction_store.read_fingerprints(transaction_store.CATEGORIZED)))
+        # Build the cube from the existing history before new parts are appended
+        aggregate_cube.load_cube()
+
+    # Occurrence counts are kept per month and dropped after the month's last row,
+    # so a date-ordered export needs memory for one month of keys, not the whole history
+    last_rows = _last_rows(TRANSACTIONS_FILE, chunk_size)
+    seen_counts = {}
+    total_rows = 0
+    new_rows = 0
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=load_artifacts, initargs=(backend,)) if workers > 1 else None
+    categorizer = make_categorizer(lambda descriptions: _predict_parallel(executor, descriptions, workers, backend), use_cache, backend, service)
+    try:
+        for chunk in pd.read_csv(TRANSACTIONS_FILE, chunksize=chunk_size):
+            months = pd.to_datetime(chunk["Date"]).dt.to_period("M")
+            fingerprints = np.empty(len(chunk), dtype="uint64")
+            for month, rows in chunk.groupby(months.to_numpy()).indices.items():
+                fingerprints[rows] = transaction_store.fingerprint_transactions(chunk.iloc[rows], seen_counts.setdefault(month, {}))
+            chunk[transaction_store.FINGERPRINT] = fingerprints
+            total_rows += len(chunk)
+            for month in [month for month in seen_counts if last_rows[month] < total_rows]:
+                del seen_counts[month]
+            chunk = chunk[known.get_indexer(chunk[transaction_store.FINGERPRINT]) == -1].copy()
+            if chunk.empty:
+                continue
+
+            with instrumentation.stage("categorize", rows=len(chunk)):
+                chunk["Category"] = categorizer.categorize(chunk["Description"])
+            chunk = finalize_categories(chunk)
+
+            with instrumentation.stage("append_store", rows=len(chunk)):
+                transaction_store.append_transactions(chunk, transaction_store.CATEGORIZED)
+                aggregate_cube.add_transactions(chunk)
+            new_rows += len(chunk)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        categorizer.save()
+
+    print(categorizer.report())
+    print(f"✅ Categorization complete! {new_rows} new of {total_rows} transactions appended to '{transaction_store.dataset_path(transaction_store.CATEGORIZED)}'")
+
+def main():
+    parser = argparse.ArgumentParser(description="Categorize transactions from 'transactions.csv'.")
+    parser.add_argument("--incremental", action="store_true", help="only categorize transactions that are not in the store yet")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="rows read per chunk in incremental mode")
+    parser.add_argument("--no-cache", action="store_true", help="send every description to the model, skipping the memo cache and keyword rules")
+    parser.add_argument("--backend", choices=BACKENDS, default="forest", help="classifier used for descriptions the cache and rules cannot resolve")
+    parser.add_argument("--service", nargs="?", const=DEFAULT_URL, help="categorize through a running 'categorization_service.py' (default %(const)s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="prediction processes in incremental mode")
+    parser.add_argument("--metrics", help="append this run's stage timings to a JSON-lines file")
+    args = parser.parse_args()
+
+    if not os.path.exists(TRANSACTIONS_FILE):
+        raise FileNotFoundError("❌ Error: 'transactions.csv' not found!")
+
+    run = instrumentation.start_run("categorize")
+    if args.incremental:
+        categorize_incremental(args.chunk_size, args.workers, not args.no_cache, args.backend, args.service)
+    else:
+        categorize_all(not args.no_cache, args.backend, args.service)
+    print(instrumentation.format_summary(run))
+    if args.metrics:
+        instrumentation.export_jsonl(args.metrics, run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import re
+import json
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+RULES_FILE = "categories.json"
+CACHE_FILE = "category_cache.json"
+
+_NON_WORD = re.compile(r"[^a-z&' ]+")
+_SPACES = re.compile(r"\s+")
+
+def normalize_description(description):
+    # "UBER *RIDE 8841 " -> "uber ride"
+    text = _NON_WORD.sub(" ", str(description).lower())
+    return _SPACES.sub(" ", text).strip()
+
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def items(self):
+        return list(self._items.items())
+
+    def __len__(self):
+        return len(self._items)
+
+class Categorizer:
+    # Exact memo -> normalized memo -> categories.json keywords -> model, on unique descriptions only
+    def __init__(self, predict, rules_file=RULES_FILE, cache_file=CACHE_FILE, max_size=100000, model_files=()):
+        self.predict = predict
+        self.cache_file = cache_file
+        self.exact = LRUCache(max_size)
+        self.normalized = LRUCache(max_size)
+        self.rules = {}
+        if rules_file and os.path.exists(rules_file):
+            with open(rules_file) as f:
+                self.rules = {normalize_description(keyword): category for keyword, category in json.load(f).items()}
+        # Longest keyword wins when several match
+        keywords = sorted(self.rules, key=len, reverse=True)
+        self._rule_pattern = re.compile(r"\b(" + "|".join(map(re.escape, keywords)) + r")\b") if keywords else None
+        self.signature = self._signature(rules_file, model_files)
+        self.stats = {"exact": 0, "normalized": 0, "rules": 0, "model": 0}
+        self.load()
+
+    @staticmethod
+    def _signature(rules_file, model_files):
+        # Cached answers are dropped when the rules or the model change
+        digest = hashlib.sha1()
+        for path in [rules_file, *model_files]:
+            if path and os.path.exists(path):
+                stat = os.stat(path)
+                digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        with open(self.cache_file) as f:
+            cached = json.load(f)
+        if cached.get("signature") != self.signature:
+            return
+        for key, value in cached.get("exact", []):
+            self.exact.put(key, value)
+        for key, value in cached.get("normalized", []):
+            self.normalized.put(key, value)
+
+    def save(self):
+        if not self.cache_file:
+            return
+        with open(self.cache_file, "w") as f:
+            json.dump({
+                "signature": self.signature,
+                "exact": self.exact.items(),
+                "normalized": self.normalized.items(),
+            }, f)
+
+    def match_rule(self, normalized):
+        if self._rule_pattern is None:
+            return None
+        match = self._rule_pattern.search(normalized)
+        return self.rules[match.group(1)] if match else None
+
+    def categorize(self, descriptions):
+        codes, uniques = pd.factorize(pd.Series(descriptions, dtype=object).astype(str))
+        row_counts = np.bincount(codes, minlength=len(uniques))
+        categories = np.empty(len(uniques), dtype=object)
+        misses = []
+
+        for i, description in enumerate(uniques):
+            category = self.exact.get(description)
+            if category is not None:
+                self.stats["exact"] += row_counts[i]
+            else:
+                normalized = normalize_description(description)
+                category = self.normalized.get(normalized)
+                if category is not None:
+                    self.stats["normalized"] += row_counts[i]
+                else:
+                    category = self.match_rule(normalized)
+                    if category is not None:
+                        self.stats["rules"] += row_counts[i]
+                        self.normalized.put(normalized, category)
+                    else:
+                        misses.append(i)
+                        continue
+                self.exact.put(description, category)
+            categories[i] = category
+
+        if misses:
+            predicted = self.predict([uniques[i] for i in misses])
+            for i, category in zip(misses, predicted):
+                categories[i] = category
+                self.stats["model"] += row_counts[i]
+                if isinstance(category, str):
+                    self.exact.put(uniques[i], category)
+                    self.normalized.put(normalize_description(uniques[i]), category)
+
+        return categories[codes]
+
+    def hit_rate(self):
+        total = sum(self.stats.values())
+        return (total - self.stats["model"]) / total if total else 0.0
+
+    def report(self):
+        return (
+            f"📊 Categorizer hit rate: {self.hit_rate():.1%} "
+            f"(exact {self.stats['exact']}, normalized {self.stats['normalized']}, "
+            f"rules {self.stats['rules']}, model {self.stats['model']})"
+        )
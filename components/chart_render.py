@@ -0,0 +1,89 @@
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+import streamlit as st
+import instrumentation
+from resources import lazy_import
+
+# Rendered PNGs shared by every session in the process, evicted least recently used first
+MAX_BYTES = 64 * 1024 * 1024
+
+class ChartCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return png
+
+    def put(self, key, png):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self.size -= len(self._items.pop(key))
+            self._items[key] = png
+            self.size += len(png)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"charts": len(self._items), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+_cache = ChartCache()
+
+def chart_key(name, *data, **options):
+    # Hash of everything that ends up in the picture: frames by content, anything else by repr
+    digest = hashlib.sha256(name.encode())
+    for item in data:
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(item, index=True).to_numpy().tobytes())
+            digest.update(repr(list(item.columns) if isinstance(item, pd.DataFrame) else item.name).encode())
+        else:
+            digest.update(repr(item).encode())
+    digest.update(repr(sorted(options.items())).encode())
+    return digest.hexdigest()
+
+def render_chart(draw, key, figsize=(10, 5), dpi=200, name="chart"):
+    png = _cache.get(key)
+    if png is None:
+        # A bare Figure is never registered with pyplot, so nothing keeps it alive after this call
+        figure = lazy_import("matplotlib.figure")
+        fig = figure.Figure(figsize=figsize)
+        try:
+            with instrumentation.stage(f"render {name}"):
+                draw(fig)
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+        finally:
+            fig.clear()
+        png = buffer.getvalue()
+        _cache.put(key, png)
+    return png
+
+def show_chart(draw, name, *data, **options):
+    # draw(fig) builds the chart; name, data and options must cover everything it plots
+    st.image(render_chart(draw, chart_key(name, *data, **options), name=name), use_container_width=True)
+
+def cache_stats():
+    return _cache.stats()
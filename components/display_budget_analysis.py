@@ -1,39 +1,29 @@
 import streamlit as st
 import pandas as pd
+from budget_index import budget_vs_actual
+from components.display_paginated_table import display_paginated_table, money
 
-def display_budget_analysis(monthly_spending, selected_period, budget_df):
+def display_budget_analysis(spending_index, selected_period, budgets):
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
     st.markdown(f'<div class="section-header">Monthly Budget Analysis for {selected_period}</div>', unsafe_allow_html=True)
 
-    month_data = monthly_spending[monthly_spending["Month"] == selected_period]
+    month_data = spending_index.month(selected_period)
     if month_data.empty:
         st.write("No data available for the selected period.")
         st.markdown('</div>', unsafe_allow_html=True)
         return
 
-    table_data = []
-
-    for _, row in month_data.iterrows():
-        category = row["Category"]
-        actual_spent = abs(row["Amount"])
-
-        budget_query = budget_df.loc[
-            (budget_df["Month"] == selected_period) & (budget_df["Category"] == category), 
-            "Budget"
-        ]
-
-        budgeted = budget_query.values[0] if not budget_query.empty else 0
-        over_budget = max(0, actual_spent - budgeted)
-        status = "✅" if over_budget == 0 else "❌"
-
-        table_data.append([
-            category, 
-            f"${budgeted:.2f}", 
-            f"${actual_spent:.2f}", 
-            f"${over_budget:.2f}", 
-            status
-        ])
-
-    table_df = pd.DataFrame(table_data, columns=["Category", "Budget ($)", "Spent ($)", "Over Budget ($)", "Status"])
-    st.table(table_df)
+    comparison = budget_vs_actual(month_data, budgets)
+    over_budget = comparison["Over Budget"]
+
+    table_df = pd.DataFrame({
+        "Category": comparison["Category"],
+        "Budget ($)": comparison["Budget"].fillna(0),
+        "Spent ($)": comparison["Spent"],
+        "Over Budget ($)": over_budget,
+        "Status": over_budget.eq(0).map({True: "✅", False: "❌"}),
+    })
+    display_paginated_table(table_df, "budget_analysis", formatters={
+        "Budget ($)": money(), "Spent ($)": money(), "Over Budget ($)": money(),
+    })
     st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
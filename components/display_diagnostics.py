@@ -0,0 +1,35 @@
+import streamlit as st
+import pandas as pd
+import instrumentation
+import resources
+from components.chart_render import cache_stats
+
+def display_diagnostics(run, profiler=None):
+    st.markdown('<div class="main-container">', unsafe_allow_html=True)
+    st.subheader("🩺 Diagnostics")
+
+    stages = instrumentation.records(run)
+    if stages.empty:
+        st.write("No stages recorded in this rerun.")
+    else:
+        st.markdown('<div class="subsection-header">Stages in this rerun</div>', unsafe_allow_html=True)
+        st.dataframe(stages[["stage", "wall_s", "cpu_s", "rows", "rss_mb", "rss_delta_mb"]].round(4), hide_index=True)
+        st.download_button("Download as JSON lines", instrumentation.to_jsonl(run), file_name=f"{run}.jsonl", mime="application/jsonl")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown('<div class="subsection-header">Chart cache</div>', unsafe_allow_html=True)
+        st.table(pd.Series(cache_stats(), name="Value"))
+    with col2:
+        st.markdown('<div class="subsection-header">Loaded once per process</div>', unsafe_allow_html=True)
+        load_times = resources.load_times()
+        if load_times:
+            st.table(pd.Series(load_times, name="Seconds").round(3))
+        else:
+            st.write("Nothing loaded yet.")
+
+    if profiler is not None:
+        st.markdown(f'<div class="subsection-header">Sampling profile ({profiler.samples} samples)</div>', unsafe_allow_html=True)
+        st.dataframe(profiler.report().round(1), hide_index=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
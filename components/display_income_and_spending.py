@@ -1,11 +1,11 @@
 import streamlit as st
 
-def display_income_and_spending(monthly_income, monthly_spending, selected_period):
+def display_income_and_spending(income_index, spending_index, selected_period):
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown('<div class="section-header">💰 Total Monthly Income</div>', unsafe_allow_html=True)
-        income_data = monthly_income[monthly_income["Month"] == selected_period]
+        income_data = income_index.month(selected_period)
         income_amount = income_data['Amount'].values[0] if not income_data.empty else 0
         st.markdown(f"""
             <div style="font-size: 1.5rem; font-weight: bold; color: #1e88e5;">${income_amount:,.2f}</div>
@@ -14,7 +14,7 @@ def display_income_and_spending(monthly_income, monthly_spending, selected_perio
 
     with col2:
         st.markdown('<div class="section-header">💸 Total Monthly Spending</div>', unsafe_allow_html=True)
-        spending_data = monthly_spending[monthly_spending["Month"] == selected_period]
+        spending_data = spending_index.month(selected_period)
         total_spending = abs(spending_data["Amount"].sum()) if not spending_data.empty else 0
         st.markdown(f"""
             <div style="font-size: 1.5rem; font-weight: bold; color: #d32f2f;">${total_spending:,.2f}</div>
@@ -0,0 +1,64 @@
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+def money(decimals=2, prefix="$", absolute=False):
+    template = f"{prefix}{{:,.{decimals}f}}"
+    def formatter(values):
+        values = values.astype("float64")
+        return (values.abs() if absolute else values).map(template.format)
+    return formatter
+
+def check_mark(tripped_value=1):
+    def formatter(values):
+        return pd.Series(np.where(values.to_numpy() == tripped_value, "❌", "✔️"), index=values.index)
+    return formatter
+
+def display_paginated_table(df, key, page_size=20, formatters=None, search_columns=(), sort_columns=None):
+    # The frame stays on the server: search and sort run on the raw values and only the visible page is formatted and sent
+    formatters = formatters or {}
+    sort_columns = list(df.columns) if sort_columns is None else list(sort_columns)
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    if search_columns:
+        with col1:
+            query = st.text_input("Search", key=f"{key}_search")
+        if query:
+            matches = np.zeros(len(df), dtype=bool)
+            for column in search_columns:
+                matches |= df[column].astype(str).str.contains(query, case=False, regex=False).to_numpy()
+            df = df[matches]
+    with col2:
+        sort_by = st.selectbox("Sort by", [None] + sort_columns, format_func=lambda column: "—" if column is None else column, key=f"{key}_sort")
+    with col3:
+        descending = st.checkbox("Descending", key=f"{key}_descending")
+
+    if df.empty:
+        st.info("No rows match the search.")
+        return
+
+    pages = math.ceil(len(df) / page_size)
+    # A narrower search can leave the remembered page past the end
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=f"{key}_page") if pages > 1 else 1
+    start = (page - 1) * page_size
+    stop = min(start + page_size, len(df))
+
+    # Only the sort key is ordered, then the page rows are picked by position
+    if sort_by is None:
+        positions = np.arange(len(df))
+        if descending:
+            positions = positions[::-1]
+    else:
+        positions = df[sort_by].reset_index(drop=True).sort_values(ascending=not descending, kind="stable").index.to_numpy()
+    view = df.iloc[positions[start:stop]]
+
+    table = pd.DataFrame({
+        column: formatters[column](view[column]) if column in formatters else view[column]
+        for column in view.columns
+    })
+    table.index = pd.RangeIndex(start + 1, stop + 1)
+    st.table(table)
+    st.caption(f"Rows {start + 1}–{stop} of {len(df)}")
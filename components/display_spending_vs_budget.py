@@ -1,12 +1,12 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+from components.chart_render import show_chart
 
-def display_spending_vs_budget(monthly_spending, selected_year, selected_month, budget_df):
+def display_spending_vs_budget(spending_index, selected_year, selected_month, budgets):
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
     st.subheader("📊 Monthly Spending vs Budget")
 
-    categories_to_display = st.multiselect("Select Categories to Display", budget_df["Category"].unique(), default=list(budget_df["Category"].unique()))
+    categories_to_display = st.multiselect("Select Categories to Display", budgets.categories(), default=budgets.categories())
 
     months_option = st.selectbox("Select Duration", ["Last 3 months", "Last 6 months", "Last 1 year", "Custom"])
     if months_option == "Last 3 months":
@@ -20,30 +20,32 @@ def display_spending_vs_budget(monthly_spending, selected_year, selected_month,
 
     selected_months = pd.date_range(end=pd.to_datetime(f"{selected_year}-{selected_month}"), periods=display_months, freq='M').to_period('M')
 
-    fig, ax = plt.subplots(figsize=(10, 5))
-
+    # Lines are collected first so the chart can be looked up by exactly what it plots
+    lines = []
     for category in categories_to_display:
-        category_spending = monthly_spending[(monthly_spending["Category"] == category) & (monthly_spending["Month"].isin(selected_months))]
+        category_spending = spending_index.category(category, selected_months[0], selected_months[-1])
         if category_spending.empty:
             st.write(f"No data available for {category} in the selected months.")
             continue
-        ax.plot(category_spending["Month"].astype(str), abs(category_spending["Amount"]), label=f"Spent - {category}")
+        lines.append((category_spending["Month"].astype(str).tolist(), category_spending["Amount"].abs().tolist(), "-", f"Spent - {category}"))
 
     for category in categories_to_display:
-        budget_query = budget_df.loc[
-            (budget_df["Month"].isin(selected_months)) & (budget_df["Category"] == category),
-            "Budget"
-        ]
-        if budget_query.empty:
+        budget_range = budgets.range(category, selected_months[0], selected_months[-1])
+        if not budget_range:
             st.write(f"No budget data available for {category} in the selected months.")
             continue
-        limit = budget_query.values[0]
-        category_months = monthly_spending[(monthly_spending["Category"] == category) & (monthly_spending["Month"].isin(selected_months))]["Month"].astype(str)
-        ax.plot(category_months, [limit] * len(category_months), "--", label=f"Budget - {category}")
-
-    ax.set_title("Monthly Spending vs Budget")
-    ax.set_xlabel("Month")
-    ax.set_ylabel("Amount ($)")
-    ax.legend()
-    st.pyplot(fig)
+        limit = budget_range[0][1]
+        category_months = spending_index.category(category, selected_months[0], selected_months[-1])["Month"].astype(str).tolist()
+        lines.append((category_months, [limit] * len(category_months), "--", f"Budget - {category}"))
+
+    def draw(fig):
+        ax = fig.subplots()
+        for months, amounts, style, label in lines:
+            ax.plot(months, amounts, style, label=label)
+        ax.set_title("Monthly Spending vs Budget")
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Amount ($)")
+        ax.legend()
+
+    show_chart(draw, "spending_vs_budget", lines)
     st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
@@ -1,8 +1,16 @@
 import os
+import sys
+import contextlib
 import streamlit as st
 import pandas as pd
 import datetime
-import predict_expenses
+import transaction_store
+import aggregate_cube
+import instrumentation
+import fraud_rules
+import resources
+from budget_index import BudgetIndex, budget_vs_actual
+from period_index import MonthIndex
 
 # Importing the components
 from components.display_income_and_spending import display_income_and_spending
@@ -12,6 +20,10 @@ from components.compare_spending_between_months import compare_spending_between_
 from components.display_category_wise_spending import display_category_wise_spending
 from components.display_spending_trends import display_spending_trends
 from components.display_category_comparison import display_category_comparison
+from components.display_diagnostics import display_diagnostics
+from components.display_paginated_table import display_paginated_table, money, check_mark
+
+run = instrumentation.start_run("dashboard")
 
 st.set_page_config(
     page_title="AI Finance Assistant",
@@ -53,41 +65,77 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-def load_data():
-    df = pd.read_csv("categorized_transactions.csv")
-    df["Date"] = pd.to_datetime(df["Date"])
-    return df
+def file_version(path):
+    # Cached views are keyed by the file they came from, so a pipeline run invalidates them
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else None
 
-df = load_data()
-df["Category"] = df["Category"].replace("Transport", "Auto & Transport")
+def load_data():
+    cube = aggregate_cube.load_cube()
+    with instrumentation.stage("cube_views"):
+        monthly_spending = aggregate_cube.monthly_spending(cube)
+        monthly_income = aggregate_cube.monthly_income(cube)
+        return {
+            "cube": cube,
+            "df_grouped": aggregate_cube.category_totals(cube),
+            "monthly_spending": monthly_spending,
+            # Month-sorted views: pages slice periods by binary search instead of masking every row
+            "spending_index": MonthIndex(monthly_spending),
+            "income_index": MonthIndex(monthly_income, category=None),
+        }
+
+def load_budgets(path):
+    if not os.path.exists(path):
+        return None
+    budget_df = pd.read_csv(path)
+    budget_df["Month"] = pd.to_datetime(budget_df["Month"]).dt.to_period("M")
+    return budget_df
 
-income_categories = ["Salary", "Income"]
-expenses_df = df[~df["Category"].isin(income_categories)]
-income_df = df[df["Category"].isin(income_categories)]
-df_grouped = expenses_df.groupby("Category")["Amount"].sum()
+def fraud_flag_columns(fraud_df):
+    # The model flag, then whatever rules fraud_rules.json defines; flags older rows predate are skipped
+    flags = ["Model_Fraud_Flag"] + fraud_rules.RuleSet(fraud_rules.load_config()).flags
+    return [flag for flag in flags if flag in fraud_df.columns]
 
-# Group expenses by Month & Category
-expenses_df["Month"] = expenses_df["Date"].dt.to_period("M")
-monthly_spending = expenses_df.groupby(["Month", "Category"])["Amount"].sum().reset_index()
+def read_suspicious_transactions(month):
+    return transaction_store.read_transactions(transaction_store.FRAUD, months=[month])
 
-# Group income by Month
-income_df["Month"] = income_df["Date"].dt.to_period("M")
-monthly_income = income_df.groupby("Month")["Amount"].sum().reset_index()
+def suspicious_transactions_version(month):
+    return file_version(transaction_store.partition_path(transaction_store.FRAUD, month))
 
 budget_file = "budgets.csv"
 
+# A fresh checkout has only the committed CSV files; they are imported into the store once
+if not transaction_store.has_dataset(transaction_store.CATEGORIZED):
+    with instrumentation.stage("migrate_legacy_csv"):
+        transaction_store.migrate_legacy_csv()
+if not transaction_store.has_dataset(transaction_store.CATEGORIZED):
+    st.info("No categorized transactions yet. Run 'python categorize_expenses.py' first.")
+    st.stop()
+
+# The cube views and the budget table load side by side; the views stay warm across reruns
+with instrumentation.stage("load_data") as record:
+    budget_future = resources.submit(load_budgets, budget_file)
+    data = resources.get_resource("dashboard data", load_data, file_version(aggregate_cube.cube_path()))
+    budget_df = budget_future.result()
+    record["rows"] = len(data["cube"])
+
+cube = data["cube"]
+df_grouped = data["df_grouped"]
+monthly_spending = data["monthly_spending"]
+spending_index = data["spending_index"]
+income_index = data["income_index"]
+
 # Check if the budget file exists; if not, create it with default values
-if not os.path.exists(budget_file):
-    categories = expenses_df["Category"].unique()
+if budget_df is None:
+    categories = monthly_spending["Category"].unique()
     months = pd.date_range("2024-01-01", "2025-12-31", freq="MS").to_period("M")
     budget_df = pd.DataFrame([
         {"Month": month, "Category": category, "Budget": 500}
         for month in months for category in categories
     ])
     budget_df.to_csv(budget_file, index=False)
-else:
-    budget_df = pd.read_csv(budget_file)
-    budget_df["Month"] = pd.to_datetime(budget_df["Month"]).dt.to_period("M")
+
+with instrumentation.stage("budgets", rows=len(budget_df)):
+    budgets = BudgetIndex(budget_df)
 
 # Sidebar: Month and Year Selection
 st.sidebar.header("Select Month and Year")
@@ -105,10 +153,18 @@ with col2:
 
 selected_period = pd.Period(f"{selected_year}-{selected_month:02d}", freq="M")
 
+# Starts reading this month's flagged transactions while the rest of the page renders
+resources.prefetch(f"fraud {selected_period}", lambda: read_suspicious_transactions(selected_period),
+                   suspicious_transactions_version(selected_period))
+
 # Sidebar: Navigation
 st.sidebar.header("Navigation")
 pages = ["Overview", "Spending vs Budget", "Compare Spending", "Category-wise Spending", "Spending Trends", "Category Comparison", "Predict Expenses", "Suggestions"]
-selected_page = st.sidebar.radio("Go to", pages)
+selected_page = st.sidebar.radio("Go to", pages, key="page_select")
+
+# Sidebar: Optional timings for this rerun
+show_diagnostics = st.sidebar.checkbox("Show diagnostics", key="show_diagnostics")
+profile_rerun = show_diagnostics and st.sidebar.button("Profile this rerun")
 
 # Sidebar: User Budget Input (Per Month and Category)
 st.sidebar.header("Set Monthly Budgets")
@@ -121,16 +177,13 @@ with col2:
     budget_month = st.selectbox("Budget Month", months, index=current_month - 1, key="budget_month_select")
 
 selected_budget_period = pd.Period(f"{budget_year}-{budget_month:02d}", freq="M")
-selected_category = st.sidebar.selectbox("Select Category", budget_df["Category"].unique())
+selected_category = st.sidebar.selectbox("Select Category", budgets.categories())
 
 # Retrieve the current budget for the selected month and category
-budget_query = budget_df.loc[
-    (budget_df["Month"] == selected_budget_period) & (budget_df["Category"] == selected_category), 
-    "Budget"
-]
+budget_value = budgets.get(selected_budget_period, selected_category)
 
 # Show the current budget if it exists, otherwise default to 500
-current_budget = int(budget_query.values[0]) if not budget_query.empty else 500
+current_budget = int(budget_value) if budget_value is not None else 500
 
 # Input to update the budget
 new_budget = st.sidebar.number_input(
@@ -141,24 +194,16 @@ new_budget = st.sidebar.number_input(
     step=100
 )
 
-# Update the budget DataFrame with the new value
-if budget_query.empty:
-    new_row = pd.DataFrame({"Month": [selected_budget_period], "Category": [selected_category], "Budget": [new_budget]})
-    budget_df = pd.concat([budget_df, new_row], ignore_index=True)
-else:
-    budget_df.loc[
-        (budget_df["Month"] == selected_budget_period) & (budget_df["Category"] == selected_category), 
-        "Budget"
-    ] = new_budget
-
-# Save the updated budget DataFrame to the CSV file
-budget_df.to_csv(budget_file, index=False)
+# Save the budget to the CSV file when it is new or has changed
+if budget_value is None or new_budget != budget_value:
+    budgets.set(selected_budget_period, selected_category, new_budget)
+    budgets.save(budget_file)
 
 # Function to display footer
 def display_footer():
     st.markdown("<br><hr><p class='footer'>🚀 Finance Dashboard by Anurag</p>", unsafe_allow_html=True)
 
-def saving_recommendations(df_grouped, budget_df, selected_period):
+def saving_recommendations(df_grouped, budgets, selected_period):
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
     st.subheader("💡 Savings Recommendations")
 
@@ -167,7 +212,7 @@ def saving_recommendations(df_grouped, budget_df, selected_period):
     alternative_options = []
 
     # Calculate total savings and identify savings goals
-    total_income = income_df[income_df["Month"] == selected_period]["Amount"].sum()
+    total_income = income_index.month(selected_period)["Amount"].sum()
     if total_income > 0:
         suggested_savings = total_income * 0.20  # Suggest saving 20% of income
         savings_goals.append(f"🏦 Consider setting aside ${suggested_savings:.2f} as savings this month.")
@@ -188,57 +233,49 @@ def saving_recommendations(df_grouped, budget_df, selected_period):
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Function to check budget exceedance
-def check_budget_exceedance(df_grouped, budget_df, selected_period):
+def check_budget_exceedance(df_grouped, budgets, selected_period):
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
     st.subheader("Budget Analysis")
 
-    # Create a DataFrame to store budget exceedance information
-    exceedance_data = []
-
-    for category, amount in df_grouped.items():
-        budget_query = budget_df.loc[
-            (budget_df["Month"] == selected_period) & (budget_df["Category"] == category), 
-            "Budget"
-        ]
-        if not budget_query.empty and abs(amount) > budget_query.values[0]:
-            exceedance_data.append({
-                "Category": category,
-                "Overbudget Value": abs(amount) - budget_query.values[0]
-            })
-
-    if exceedance_data:
-        exceedance_df = pd.DataFrame(exceedance_data)
-        st.table(exceedance_df)
+    comparison = budget_vs_actual(df_grouped.reset_index(), budgets, selected_period)
+    exceeded = comparison[comparison["Budget"].notna() & (comparison["Spent"] > comparison["Budget"])]
+    exceedance_data = pd.DataFrame({
+        "Category": exceeded["Category"],
+        "Overbudget Value": exceeded["Spent"] - exceeded["Budget"],
+    })
+
+    if not exceedance_data.empty:
+        display_paginated_table(exceedance_data, "exceedance", formatters={"Overbudget Value": money()})
     else:
         st.info("No budget exceedance for the selected period.")
 
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Function to display suspicious transactions
-def display_suspicious_transactions(df, selected_period):
+def display_suspicious_transactions(selected_period):
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
     st.subheader("Suspicious Transactions")
 
     # Load suspicious transactions
-    if os.path.exists("fraud_transactions.csv"):
-        fraud_df = pd.read_csv("fraud_transactions.csv")
-        fraud_df["Date"] = pd.to_datetime(fraud_df["Date"]).dt.strftime('%Y-%m-%d')
-        fraud_df["Month"] = pd.to_datetime(fraud_df["Date"]).dt.to_period("M")
-        fraud_df = fraud_df[fraud_df["Month"] == selected_period]
+    if transaction_store.has_dataset(transaction_store.FRAUD):
+        fraud_df = resources.get_resource(
+            f"fraud {selected_period}", lambda: read_suspicious_transactions(selected_period),
+            suspicious_transactions_version(selected_period),
+        )
 
         if not fraud_df.empty:
-            fraud_df["Model Check"] = fraud_df["Model_Fraud_Flag"].apply(lambda x: '❌' if x == -1 else '✔️')
-            fraud_df["Large Amount Check"] = fraud_df["Large_Amount_Flag"].apply(lambda x: '❌' if x == 1 else '✔️')
-            fraud_df["Odd Hour Check"] = fraud_df["Odd_Hour_Flag"].apply(lambda x: '❌' if x == 1 else '✔️')
-            fraud_df["Final Check"] = fraud_df["Final_Fraud"].apply(lambda x: '❌' if x == 1 else '✔️')
-
-            # Format Amount column
-            fraud_df["Amount"] = fraud_df["Amount"].apply(lambda x: f'{abs(x):,.0f}')
-
-            # Adjust column widths for better readability
-            fraud_df = fraud_df.rename(columns={"Description": "Description"})
-            
-            st.table(fraud_df[["Date", "Description", "Amount", "Model Check", "Large Amount Check", "Odd Hour Check", "Final Check"]])
+            # "Large_Amount_Flag" -> "Large Amount Check"; the model marks outliers with -1, the rules with 1
+            flags = fraud_flag_columns(fraud_df)
+            labels = {flag: flag.removesuffix("_Flag").removesuffix("_Fraud").replace("_", " ") + " Check" for flag in flags}
+            formatters = {
+                "Date": lambda dates: dates.dt.strftime('%Y-%m-%d'),
+                "Amount": money(0, prefix="", absolute=True),
+                **{labels[flag]: check_mark(-1 if flag == "Model_Fraud_Flag" else 1) for flag in flags},
+            }
+            display_paginated_table(
+                fraud_df[["Date", "Description", "Amount"] + flags].rename(columns=labels), "suspicious",
+                formatters=formatters, search_columns=["Description"],
+            )
         else:
             st.info("No suspicious transactions found for the selected period.")
     else:
@@ -247,30 +284,49 @@ def display_suspicious_transactions(df, selected_period):
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Render the selected page
-if selected_page == "Overview":
-    display_income_and_spending(monthly_income, monthly_spending, selected_period)
-    display_budget_analysis(monthly_spending, selected_period, budget_df)
-elif selected_page == "Spending vs Budget":
-    display_spending_vs_budget(monthly_spending, selected_year, selected_month, budget_df)
-elif selected_page == "Compare Spending":
-    compare_spending_between_months(expenses_df, monthly_spending)
-elif selected_page == "Category-wise Spending":
-    display_category_wise_spending(df, monthly_spending, budget_df)
-elif selected_page == "Spending Trends":
-    display_spending_trends(expenses_df)
-elif selected_page == "Category Comparison":
-    display_category_comparison(df, expenses_df, budget_df)
-elif selected_page == "Predict Expenses":
-    st.markdown('<div class="main-container">', unsafe_allow_html=True)
-    st.subheader("🔮 Expense Predictions")
-    fig, combined_expenses = predict_expenses.run_expense_prediction()
-    st.pyplot(fig)
-    st.subheader("📊 Expense Data")
-    st.table(combined_expenses)
-    st.markdown('</div>', unsafe_allow_html=True)
-elif selected_page == "Suggestions":
-    saving_recommendations(df_grouped, budget_df, selected_period)
-    check_budget_exceedance(df_grouped, budget_df, selected_period)
-    display_suspicious_transactions(df, selected_period)
+profiler_context = instrumentation.profile() if profile_rerun else contextlib.nullcontext()
+with instrumentation.stage(f"page {selected_page}"), profiler_context as profiler:
+    if selected_page == "Overview":
+        display_income_and_spending(income_index, spending_index, selected_period)
+        display_budget_analysis(spending_index, selected_period, budgets)
+    elif selected_page == "Spending vs Budget":
+        display_spending_vs_budget(spending_index, selected_year, selected_month, budgets)
+    elif selected_page == "Compare Spending":
+        compare_spending_between_months(spending_index)
+    elif selected_page == "Category-wise Spending":
+        display_category_wise_spending(cube, spending_index, budgets)
+    elif selected_page == "Spending Trends":
+        display_spending_trends(cube)
+    elif selected_page == "Category Comparison":
+        display_category_comparison(cube, spending_index, budgets)
+    elif selected_page == "Predict Expenses":
+        st.markdown('<div class="main-container">', unsafe_allow_html=True)
+        st.subheader("🔮 Expense Predictions")
+        # The model is retrained, and xgboost imported, only when the monthly expenses change
+        predict_expenses = resources.lazy_import("predict_expenses")
+        try:
+            forecast = predict_expenses.cached_forecast()
+        except (FileNotFoundError, ValueError) as error:
+            st.error(str(error))
+        else:
+            st.image(forecast["png"])
+            st.subheader("📊 Expense Data")
+            display_paginated_table(forecast["table"].rename_axis("Month").reset_index(), "forecast_table", formatters={"Expense": money()})
+        st.markdown('</div>', unsafe_allow_html=True)
+    elif selected_page == "Suggestions":
+        saving_recommendations(df_grouped, budgets, selected_period)
+        check_budget_exceedance(df_grouped, budgets, selected_period)
+        display_suspicious_transactions(selected_period)
+
+if show_diagnostics:
+    display_diagnostics(run, profiler)
+
+# Warm the neighbouring months in the background for the next rerun
+for month in (selected_period - 1, selected_period + 1):
+    resources.prefetch(f"fraud {month}", lambda month=month: read_suspicious_transactions(month), suspicious_transactions_version(month))
+# The forecast is only kept warm once the Predict page has been opened in this process, so a cold
+# start never imports xgboost; a failed warm-up is not cached and the page reports the error itself
+if "predict_expenses" in sys.modules:
+    resources.prefetch("forecast warmup", sys.modules["predict_expenses"].cached_forecast, file_version(aggregate_cube.cube_path()))
 
 display_footer()
\ No newline at end of file
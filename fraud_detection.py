@@ -1,47 +1,342 @@
 import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import joblib
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
+import transaction_store
+import fraud_rules
+import fraud_features
+import instrumentation
 
-# Verify that the required file exists
-if not os.path.exists("categorized_transactions.csv"):
-    raise FileNotFoundError("❌ Error: 'categorized_transactions.csv' not found! Run 'categorize_expenses.py' first.")
+FRAUD_MODEL_FILE = "fraud_model.joblib"
 
-df = pd.read_csv("categorized_transactions.csv")
-df['Transaction_Type'] = np.where(df['Amount'] < 0, 'Debit', 'Credit')
+FEATURES = ['Transaction_Amount', 'Transaction_Hour', 'Transaction_Type_Debit']
 
-df['Transaction_Hour'] = pd.to_datetime(df['Date'], errors='coerce').dt.hour
+SMALL_BATCH = 256
+SCORE_CHUNK = 100000
 
-df['Transaction_Amount'] = df['Amount'].abs()
+def build_features(dates, amounts):
+    amounts = np.asarray(amounts, dtype="float64")
+    hours = pd.to_datetime(pd.Series(dates), errors='coerce').dt.hour.to_numpy(dtype="float64")
+    return np.column_stack([np.abs(amounts), hours, (amounts < 0).astype("float64")])
 
-df = pd.get_dummies(df, columns=['Transaction_Type'], drop_first=True)
+def _fit_forest(X, contamination, n_estimators):
+    model = IsolationForest(contamination=contamination, n_estimators=n_estimators, random_state=42)
+    return model.fit(X)
 
-features = ['Transaction_Amount', 'Transaction_Hour', 'Transaction_Type_Debit']
+def model_features(config):
+    # The behavioural features need the Merchant_ZScore etc. columns from fraud_features.attach_features
+    if config["model"].get("behavioural_features"):
+        return FEATURES + fraud_features.FEATURES
+    return FEATURES
 
-scaler = StandardScaler()
-df[features] = scaler.fit_transform(df[features])
+def fit_fraud_model(df, config=None, workers=None):
+    config = config or fraud_rules.load_config()
+    settings = config["model"]
+    params = (settings["contamination"], settings.get("n_estimators", 100))
+    features = model_features(config)
+    X = build_features(df['Date'], df['Amount'])
+    behavioural = features[len(FEATURES):]
+    if behavioural:
+        missing = [feature for feature in behavioural if feature not in df.columns]
+        if missing:
+            raise ValueError(f"❌ Error: Behavioural features {missing} missing; run them through 'fraud_features.attach_features' first")
+        X = np.column_stack([X, df[behavioural].to_numpy(dtype="float64")])
 
-contamination_rate = 0.03
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
 
-# Train anomaly detection model
-model = IsolationForest(contamination=contamination_rate, random_state=42)
-df["Model_Fraud_Flag"] = model.fit_predict(df[features])
+    # Segments with too few rows are scored by the global model
+    segment_by = settings.get("segment_by")
+    segments = {}
+    if segment_by:
+        if segment_by not in df.columns:
+            raise ValueError(f"❌ Error: Cannot segment fraud models by missing column '{segment_by}'")
+        keys = df[segment_by].astype(str).to_numpy()
+        sizes = pd.Series(keys).value_counts()
+        segments = {key: keys == key for key in sizes.index[sizes >= settings.get("min_segment_rows", 200)]}
 
-large_amount_threshold = 3
-df['Large_Amount_Flag'] = np.where(df['Transaction_Amount'] > large_amount_threshold, 1, 0)
+    # Train anomaly detection models, one process per segment
+    if segments:
+        with ProcessPoolExecutor(workers) as executor:
+            model = executor.submit(_fit_forest, X_scaled, *params)
+            jobs = {key: executor.submit(_fit_forest, X_scaled[rows], *params) for key, rows in segments.items()}
+            model = model.result()
+            segment_models = {key: job.result() for key, job in jobs.items()}
+    else:
+        model = _fit_forest(X_scaled, *params)
+        segment_models = {}
 
-df['Odd_Hour_Flag'] = np.where((df['Transaction_Type_Debit'] == 1) & 
-                               ((df['Transaction_Hour'] < 6) | (df['Transaction_Hour'] > 22)), 1, 0)
+    return {
+        "scaler": scaler,
+        "model": model,
+        "segment_by": segment_by,
+        "segment_models": segment_models,
+        "features": features,
+        "config": config,
+        "trained_rows": len(df),
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+    }
 
-df['Final_Fraud'] = np.where((df['Model_Fraud_Flag'] == -1) | 
-                             (df['Large_Amount_Flag'] == 1) | 
-                             (df['Odd_Hour_Flag'] == 1), 1, 0)
+def save_fraud_model(artifact, path=FRAUD_MODEL_FILE):
+    joblib.dump(artifact, path)
 
-df['Final_Fraud'] = np.where(df['Amount'] > 0, 0, df['Final_Fraud'])
+def load_fraud_model(path=FRAUD_MODEL_FILE):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"❌ Error: '{path}' not found! Run 'fraud_detection.py fit' first.")
+    return joblib.load(path)
 
-fraudulent = df[df["Final_Fraud"] == 1]
+def _average_path_length(n):
+    n = np.asarray(n, dtype="float64")
+    length = np.where(n == 2, 1.0, 0.0)
+    large = n > 2
+    length[large] = 2.0 * (np.log(n[large] - 1.0) + np.euler_gamma) - 2.0 * (n[large] - 1.0) / n[large]
+    return length
 
-fraudulent.to_csv("fraud_transactions.csv", index=False)
+class CompiledIsolationForest:
+    # The fitted trees flattened into padded arrays and walked level by level for all trees at once;
+    # IsolationForest.predict spends milliseconds of per-call overhead, which dominates single-item scoring
+    def __init__(self, forest):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        size = max(tree.node_count for tree in trees)
+        n_trees = len(trees)
+        self.left = np.full((n_trees, size), -1, dtype="int64")
+        self.right = np.full((n_trees, size), -1, dtype="int64")
+        self.feature = np.zeros((n_trees, size), dtype="int64")
+        self.threshold = np.zeros((n_trees, size))
+        self.path_length = np.zeros((n_trees, size))
+        self.max_depth = max(tree.max_depth for tree in trees)
 
-print(f"✅ Fraud detection complete! {len(fraudulent)} transactions flagged as suspicious.")
\ No newline at end of file
+        for i, (tree, features) in enumerate(zip(trees, forest.estimators_features_)):
+            count = tree.node_count
+            self.left[i, :count] = tree.children_left
+            self.right[i, :count] = tree.children_right
+            # Map each tree's feature subset back to the input columns
+            self.feature[i, :count] = np.asarray(features)[np.maximum(tree.feature, 0)]
+            self.threshold[i, :count] = tree.threshold
+            depth = np.zeros(count)
+            for node in range(count):
+                for child in (tree.children_left[node], tree.children_right[node]):
+                    if child != -1:
+                        depth[child] = depth[node] + 1
+            self.path_length[i, :count] = depth + _average_path_length(tree.n_node_samples)
+
+        self.rows = np.arange(n_trees)
+        self.normalizer = n_trees * _average_path_length([forest.max_samples_])[0]
+        self.offset = forest.offset_
+
+    def decision_function(self, X):
+        X = np.asarray(X, dtype="float64")
+        nodes = np.zeros((len(X), len(self.rows)), dtype="int64")
+        samples = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            values = X[samples, self.feature[self.rows, nodes]]
+            children = np.where(values <= self.threshold[self.rows, nodes], self.left[self.rows, nodes], self.right[self.rows, nodes])
+            nodes = np.where(children == -1, nodes, children)
+        depths = self.path_length[self.rows, nodes].sum(axis=1)
+        return -(2.0 ** (-depths / self.normalizer)) - self.offset
+
+    def predict(self, X):
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+class FraudScorer:
+    # Scores new transactions against a persisted model without refitting anything;
+    # config overrides the rules saved with the model, its "model" section only matters when fitting.
+    # Behavioural features come from the scored rows, or from feature_store when the rows lack them.
+    def __init__(self, artifact, config=None, feature_store=None):
+        self.artifact = artifact
+        self.mean = artifact["scaler"].mean_
+        self.scale = artifact["scaler"].scale_
+        self.model = artifact["model"]
+        self.segment_by = artifact.get("segment_by")
+        self.segment_models = artifact.get("segment_models", {})
+        self.rules = fraud_rules.RuleSet(config or artifact["config"])
+        self.flags = ['Model_Fraud_Flag'] + self.rules.flags
+        self.model_behaviour = artifact.get("features", FEATURES)[len(FEATURES):]
+        # Behavioural features the model or the rules read; rules see them unscaled
+        self.behavioural = [
+            feature for feature in fraud_features.FEATURES
+            if feature in self.model_behaviour or feature in self.rules.columns
+        ]
+        self.feature_store = feature_store
+        # Raw columns the rules read besides the features and Amount
+        self.inputs = sorted(self.rules.columns - set(FEATURES) - set(fraud_features.FEATURES) - set(self.flags) - {"Amount"})
+        self._compiled = {}
+
+    def _predict(self, key, X):
+        model = self.segment_models.get(key, self.model)
+        # Small batches skip sklearn's per-call overhead; large ones use its tree traversal
+        if len(X) <= SMALL_BATCH:
+            if key not in self._compiled:
+                self._compiled[key] = CompiledIsolationForest(model)
+            model = self._compiled[key]
+        return model.predict(X)
+
+    def model_flags(self, scaled, segments=None):
+        if not self.segment_models or segments is None:
+            return self._predict(None, scaled)
+        codes, uniques = pd.factorize(pd.Series(segments).astype(str))
+        flags = np.empty(len(scaled), dtype="int64")
+        for code, key in enumerate(uniques):
+            rows = codes == code
+            flags[rows] = self._predict(key if key in self.segment_models else None, scaled[rows])
+        return flags
+
+    def behaviour(self, records):
+        # records: DataFrame or dict of columns with Date, Amount and Description
+        if not self.behavioural:
+            return None
+        if all(feature in records for feature in self.behavioural):
+            return {feature: np.asarray(records[feature], dtype="float64") for feature in self.behavioural}
+        if self.feature_store is None:
+            raise ValueError("❌ Error: Transactions lack behavioural features and the scorer has no feature store")
+        # Records without a description get neutral merchant features rather than sharing one blank merchant
+        descriptions = records["Description"] if "Description" in records else [None] * len(records["Amount"])
+        values = self.feature_store.update(records["Date"], records["Amount"], descriptions)
+        return dict(zip(fraud_features.FEATURES, values.T))
+
+    def score_arrays(self, dates, amounts, segments=None, inputs=None, behaviour=None):
+        amounts = np.asarray(amounts, dtype="float64")
+        X = build_features(dates, amounts)
+        if self.model_behaviour:
+            X = np.column_stack([X] + [behaviour[feature] for feature in self.model_behaviour])
+        scaled = (X - self.mean) / self.scale
+
+        # The rules compare the scaled base features, as they always have
+        columns = dict(inputs or {})
+        columns.update(zip(FEATURES, scaled.T))
+        columns.update(behaviour or {})
+        columns["Amount"] = amounts
+        columns["Model_Fraud_Flag"] = self.model_flags(scaled, segments)
+        self.rules.evaluate(columns)
+        return scaled, np.column_stack([columns[flag] for flag in self.flags])
+
+    def _segments(self, records):
+        if self.segment_by and self.segment_models:
+            return records[self.segment_by]
+        return None
+
+    def score(self, df):
+        inputs = {column: df[column].to_numpy() for column in self.inputs}
+        scaled, flags = self.score_arrays(df['Date'], df['Amount'], self._segments(df), inputs, self.behaviour(df))
+        df = df.copy()
+        df[FEATURES] = scaled[:, :len(FEATURES)]
+        df[self.flags] = flags
+        return df
+
+    def score_one(self, date, amount, **fields):
+        records = {"Date": [date], "Amount": [amount], **{k: [v] for k, v in fields.items()}}
+        _, flags = self.score_arrays([date], [amount], self._segments(records),
+                                     {column: [fields[column]] for column in self.inputs}, self.behaviour(records))
+        return dict(zip(self.flags, flags[0].tolist()))
+
+    def stream(self, transactions, batch_size=1):
+        # transactions: iterable of dicts with at least Date and Amount
+        batch = []
+        for transaction in transactions:
+            batch.append(transaction)
+            if len(batch) >= batch_size:
+                yield from self._score_batch(batch)
+                batch = []
+        if batch:
+            yield from self._score_batch(batch)
+
+    def _score_batch(self, batch):
+        records = pd.DataFrame(batch)
+        _, flags = self.score_arrays(records["Date"], records["Amount"], self._segments(records),
+                                     {column: records[column].to_numpy() for column in self.inputs}, self.behaviour(records))
+        for transaction, row in zip(batch, flags.tolist()):
+            yield {**transaction, **dict(zip(self.flags, row))}
+
+_scorer = None
+
+def _init_scorer(artifact, config):
+    global _scorer
+    _scorer = FraudScorer(artifact, config)
+
+def _score_chunk(chunk):
+    return _scorer.score(chunk)
+
+def score_parallel(df, artifact, config=None, workers=None, chunk_size=SCORE_CHUNK):
+    # The scaler and models are fixed, so chunks score independently on separate cores
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(df) <= chunk_size:
+        return FraudScorer(artifact, config).score(df)
+    chunks = [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+    with ProcessPoolExecutor(workers, initializer=_init_scorer, initargs=(artifact, config)) as executor:
+        return pd.concat(executor.map(_score_chunk, chunks))
+
+def load_categorized():
+    # Verify that the required data exists
+    if not transaction_store.has_dataset(transaction_store.CATEGORIZED):
+        raise FileNotFoundError("❌ Error: Categorized transactions not found! Run 'categorize_expenses.py' first.")
+    return transaction_store.read_transactions(transaction_store.CATEGORIZED)
+
+def fit(workers=None):
+    df = load_categorized()
+    with instrumentation.stage("behavioural_features", rows=len(df)):
+        df = fraud_features.attach_features(df)
+    with instrumentation.stage("fit_fraud_model", rows=len(df)):
+        artifact = fit_fraud_model(df, workers=workers)
+    save_fraud_model(artifact)
+    segments = f" ({len(artifact['segment_models'])} {artifact['segment_by']} segments)" if artifact["segment_models"] else ""
+    print(f"✅ Fraud model trained on {len(df)} transactions{segments} and saved to '{FRAUD_MODEL_FILE}'")
+    return artifact
+
+def run(workers=None):
+    with instrumentation.stage("load_categorized") as record:
+        df = load_categorized()
+        record["rows"] = len(df)
+    with instrumentation.stage("behavioural_features", rows=len(df)):
+        df = fraud_features.attach_features(df)
+    artifact = load_fraud_model() if os.path.exists(FRAUD_MODEL_FILE) else fit(workers)
+
+    with instrumentation.stage("score", rows=len(df)):
+        df = score_parallel(df, artifact, fraud_rules.load_config(), workers)
+    fraudulent = df[df["Final_Fraud"] == 1]
+
+    with instrumentation.stage("write_fraud", rows=len(fraudulent)):
+        transaction_store.write_transactions(fraudulent, transaction_store.FRAUD)
+
+    print(f"✅ Fraud detection complete! {len(fraudulent)} transactions flagged as suspicious.")
+
+def score_stream(batch_size=1, infile=sys.stdin, outfile=sys.stdout):
+    # JSON lines in, JSON lines with fraud flags out
+    # Streamed transactions update the features in memory only; 'run' records them once they are stored
+    scorer = FraudScorer(load_fraud_model(), fraud_rules.load_config(), fraud_features.FeatureStore())
+    transactions = (json.loads(line) for line in infile if line.strip())
+    for scored in scorer.stream(transactions, batch_size):
+        outfile.write(json.dumps(scored) + "\n")
+        outfile.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag suspicious transactions.")
+    parser.add_argument("--workers", type=int, default=None, help="processes for training segments and scoring chunks")
+    parser.add_argument("--metrics", help="append this run's stage timings to a JSON-lines file")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("run", help="score every categorized transaction (default); fits a model only if none is saved")
+    commands.add_parser("fit", help=f"retrain the scaler and anomaly models on the full history using '{fraud_rules.RULES_FILE}'")
+    stream_parser = commands.add_parser("score-stream", help="score JSON-lines transactions from stdin")
+    stream_parser.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "score-stream":
+        score_stream(args.batch_size)
+        return
+    run_id = instrumentation.start_run("fraud")
+    if args.command == "fit":
+        fit(args.workers)
+    else:
+        run(args.workers)
+    print(instrumentation.format_summary(run_id))
+    if args.metrics:
+        instrumentation.export_jsonl(args.metrics, run_id)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import os
+import math
+import uuid
+import glob
+import shutil
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+import transaction_store
+from categorizer import normalize_description
+
+# Running state and the features of every transaction already seen, kept next to the store
+FEATURE_DIR = "fraud_features"
+STATE_FILE = "state.joblib"
+
+# Time constants (days) of the exponentially decayed spend windows
+VELOCITY_WINDOWS = {"Spend_Velocity_1d": 1, "Spend_Velocity_7d": 7}
+FEATURES = ["Merchant_ZScore", "Days_Since_Merchant"] + list(VELOCITY_WINDOWS)
+
+# Below this many earlier transactions a merchant's z-score is 0; spreads under a dollar count as a dollar
+MIN_HISTORY = 5
+STD_FLOOR = 1.0
+# Days since the last visit for a merchant never seen before, and the cap for long gaps
+NEW_MERCHANT_DAYS = 365
+# Feature part files kept before they are compacted into one, so loading stays one or a few reads
+MAX_PARTS = 8
+
+def feature_dir(root=transaction_store.STORE_ROOT):
+    return os.path.join(root, FEATURE_DIR)
+
+def merchant_keys(descriptions):
+    # Normalized once per distinct description: "UBER *RIDE 8841" and "Uber Ride" are one merchant.
+    # Missing descriptions give "", which is no merchant at all
+    codes, uniques = pd.factorize(pd.Series(descriptions, dtype=object).fillna("").astype(str))
+    return np.array([normalize_description(description) for description in uniques], dtype=object)[codes]
+
+class FeatureStore:
+    # Per-merchant Welford statistics and decayed spend windows, updated in O(1) per transaction,
+    # so scoring new transactions costs the same however long the history is
+    def __init__(self, root=transaction_store.STORE_ROOT):
+        self.path = feature_dir(root) if root else None
+        self.merchants = {}  # merchant -> [count, mean, m2, last_day]
+        self.velocity = [0.0] * len(VELOCITY_WINDOWS)
+        self.last_day = None
+        self.known = pd.Index([], dtype="uint64")
+        self.table = np.empty((0, len(FEATURES)))
+        self._new = []
+        if self.path and os.path.exists(os.path.join(self.path, STATE_FILE)):
+            self.load()
+
+    def load(self):
+        state = joblib.load(os.path.join(self.path, STATE_FILE))
+        self.merchants = state["merchants"]
+        self.velocity = state["velocity"]
+        self.last_day = state["last_day"]
+        parts = self.parts()
+        if parts:
+            table = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+            # A compaction interrupted before removing the old parts leaves each row twice
+            table = table.drop_duplicates(transaction_store.FINGERPRINT)
+            self.known = pd.Index(table[transaction_store.FINGERPRINT].to_numpy(dtype="uint64"))
+            self.table = table[FEATURES].to_numpy(dtype="float64")
+
+    def parts(self):
+        return sorted(glob.glob(os.path.join(self.path, "part-*.parquet")))
+
+    def update(self, dates, amounts, descriptions):
+        # Features of each transaction in the given order; every one then becomes history for the next.
+        # Known limit: the spend windows only move forward, so a transaction dated before the latest one
+        # seen (a backfill) neither adds to them nor gets velocity features of its own (they are 0)
+        days = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[D]").astype("int64")
+        amounts = np.asarray(amounts, dtype="float64")
+        merchants = merchant_keys(descriptions)
+        decay = [1.0 / window for window in VELOCITY_WINDOWS.values()]
+        features = np.empty((len(days), len(FEATURES)))
+
+        for i, (day, amount, merchant) in enumerate(zip(days.tolist(), amounts.tolist(), merchants)):
+            value = abs(amount)
+            # Without a merchant the merchant features are neutral and no merchant's history changes
+            zscore = since = 0.0
+            if merchant:
+                stats = self.merchants.get(merchant)
+                if stats is None:
+                    stats = self.merchants[merchant] = [0, 0.0, 0.0, day]
+                    since = NEW_MERCHANT_DAYS
+                else:
+                    since = min(max(day - stats[3], 0), NEW_MERCHANT_DAYS)
+
+                count, mean, m2, last_day = stats
+                if count >= MIN_HISTORY:
+                    zscore = (value - mean) / max(math.sqrt(m2 / (count - 1)), STD_FLOOR)
+                count += 1
+                delta = value - mean
+                mean += delta / count
+                m2 += delta * (value - mean)
+                stats[:] = [count, mean, m2, max(day, last_day)]
+
+            features[i, 0] = zscore
+            features[i, 1] = since
+            if self.last_day is not None and day < self.last_day:
+                features[i, 2:] = 0.0
+                continue
+            elapsed = day - self.last_day if self.last_day is not None else 0
+            spent = value if amount < 0 else 0.0
+            for w, rate in enumerate(decay):
+                self.velocity[w] = self.velocity[w] * math.exp(-elapsed * rate) + spent
+            self.last_day = day
+            features[i, 2:] = self.velocity
+        return features
+
+    def attach(self, df):
+        # Stored transactions keep the features they got when first seen; only new ones update the state
+        fingerprints = df[transaction_store.FINGERPRINT].to_numpy(dtype="uint64") \
+            if transaction_store.FINGERPRINT in df.columns else transaction_store.fingerprint_transactions(df)
+        positions = self.known.get_indexer(fingerprints)
+        features = np.empty((len(df), len(FEATURES)))
+        seen = positions >= 0
+        features[seen] = self.table[positions[seen]]
+
+        new = np.flatnonzero(~seen)
+        if len(new):
+            order = new[np.argsort(pd.to_datetime(df["Date"]).to_numpy()[new], kind="stable")]
+            features[order] = self.update(df["Date"].to_numpy()[order], df["Amount"].to_numpy()[order], df["Description"].to_numpy()[order])
+            self._new.append((fingerprints[order], features[order]))
+            self.known = self.known.append(pd.Index(fingerprints[order]))
+            self.table = np.vstack([self.table, features[order]])
+
+        df = df.copy()
+        df[FEATURES] = features
+        return df
+
+    def save(self):
+        # Writes only when new transactions were seen: the state and one part file of their features.
+        # Past MAX_PARTS the whole table, already in memory, is rewritten as a single part
+        if not self.path or not self._new:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        old_parts = self.parts()
+        if len(old_parts) + 1 > MAX_PARTS:
+            fingerprints, features = self.known.to_numpy(), self.table
+        else:
+            fingerprints = np.concatenate([fingerprints for fingerprints, _ in self._new])
+            features = np.vstack([features for _, features in self._new])
+            old_parts = []
+        part = pd.DataFrame(features, columns=FEATURES)
+        part.insert(0, transaction_store.FINGERPRINT, fingerprints)
+        part.to_parquet(os.path.join(self.path, f"part-{uuid.uuid4().hex}.parquet"), index=False)
+        for old_part in old_parts:
+            os.remove(old_part)
+        joblib.dump({"merchants": self.merchants, "velocity": self.velocity, "last_day": self.last_day},
+                    os.path.join(self.path, STATE_FILE))
+        self._new = []
+
+def attach_features(df, root=transaction_store.STORE_ROOT):
+    store = FeatureStore(root)
+    df = store.attach(df)
+    store.save()
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the behavioural fraud features from the categorized transactions.")
+    parser.add_argument("--rebuild", action="store_true", help="drop the saved state and recompute from the full history")
+    args = parser.parse_args()
+
+    if not transaction_store.has_dataset(transaction_store.CATEGORIZED):
+        raise FileNotFoundError("❌ Error: Categorized transactions not found! Run 'categorize_expenses.py' first.")
+    if args.rebuild and os.path.exists(feature_dir()):
+        shutil.rmtree(feature_dir())
+
+    store = FeatureStore()
+    before = len(store.known)
+    store.attach(transaction_store.read_transactions(transaction_store.CATEGORIZED))
+    store.save()
+    print(f"✅ Behavioural features updated: {len(store.known) - before} new transactions, "
+          f"{len(store.merchants)} merchants, {len(store.known)} total")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import json
+import numpy as np
+
+RULES_FILE = "fraud_rules.json"
+
+# A condition is [column, operator, value], {"all": [...]}, {"any": [...]} or {"not": condition}.
+# Columns are the scaled model features, the raw transaction columns and any flag computed before it.
+_OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+    "in": np.isin,
+}
+
+def load_config(path=RULES_FILE):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"❌ Error: '{path}' not found!")
+    with open(path) as f:
+        return json.load(f)
+
+def compile_condition(spec, columns=None):
+    # columns, when given, collects every column the condition reads
+    if isinstance(spec, list):
+        column, op, value = spec
+        if columns is not None:
+            columns.add(column)
+        if op not in _OPERATORS:
+            raise ValueError(f"❌ Error: Unknown operator '{op}' in fraud rule {spec}")
+        operator = _OPERATORS[op]
+        return lambda data: operator(np.asarray(data[column]), value)
+    if "all" in spec:
+        parts = [compile_condition(part, columns) for part in spec["all"]]
+        return lambda data: np.logical_and.reduce([part(data) for part in parts])
+    if "any" in spec:
+        parts = [compile_condition(part, columns) for part in spec["any"]]
+        return lambda data: np.logical_or.reduce([part(data) for part in parts])
+    if "not" in spec:
+        part = compile_condition(spec["not"], columns)
+        return lambda data: np.logical_not(part(data))
+    raise ValueError(f"❌ Error: Invalid fraud rule {spec}")
+
+class RuleSet:
+    def __init__(self, config):
+        self.columns = set()
+        self.rules = [(name, compile_condition(spec, self.columns)) for name, spec in config["rules"].items()]
+        self.final = compile_condition(config["final"], self.columns)
+        self.flags = [name for name, _ in self.rules] + ["Final_Fraud"]
+
+    def evaluate(self, columns):
+        # Adds one 0/1 array per rule plus Final_Fraud to columns
+        for name, rule in self.rules:
+            columns[name] = rule(columns).astype("int64")
+        columns["Final_Fraud"] = self.final(columns).astype("int64")
+        return columns
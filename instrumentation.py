@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import tracemalloc
+import functools
+import contextvars
+from collections import Counter, deque
+from contextlib import contextmanager
+import pandas as pd
+
+# Every stage appends one JSON line here when set
+METRICS_FILE = os.environ.get("FINANCE_METRICS_FILE")
+MAX_RECORDS = 5000
+
+_records = deque(maxlen=MAX_RECORDS)
+_lock = threading.Lock()
+_run = contextvars.ContextVar("run", default=None)
+_path = contextvars.ContextVar("path", default=())
+# Peak traced memory of each open stage since its last child started; tracemalloc has one global peak
+_peaks = contextvars.ContextVar("peaks", default=())
+
+if os.environ.get("FINANCE_TRACE_MEMORY") and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def start_run(label):
+    # Groups the stages of one script run or one dashboard rerun
+    run = f"{label}-{uuid.uuid4().hex[:8]}"
+    _run.set(run)
+    return run
+
+@contextmanager
+def stage(name, rows=None):
+    # Yields the record; set record["rows"] once the row count is known
+    path = _path.get() + (name,)
+    token = _path.set(path)
+    record = {"run": _run.get(), "stage": "/".join(path), "rows": rows}
+    tracing = tracemalloc.is_tracing()
+    peaks = _peaks.get()
+    if tracing:
+        # The enclosing stage keeps the peak it reached so far before the global peak is reset
+        current, peak = tracemalloc.get_traced_memory()
+        if peaks:
+            peaks[-1][0] = max(peaks[-1][0], peak)
+        tracemalloc.reset_peak()
+        peaks = peaks + ([current],)
+    peaks_token = _peaks.set(peaks)
+    rss = _rss_mb()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield record
+    finally:
+        record["wall_s"] = time.perf_counter() - wall
+        record["cpu_s"] = time.process_time() - cpu
+        record["rss_mb"] = _rss_mb()
+        record["rss_delta_mb"] = record["rss_mb"] - rss
+        if tracing and tracemalloc.is_tracing():
+            peak = max(peaks[-1][0], tracemalloc.get_traced_memory()[1])
+            record["peak_traced_mb"] = peak / 2 ** 20
+            if len(peaks) > 1:
+                peaks[-2][0] = max(peaks[-2][0], peak)
+        record["finished_at"] = time.time()
+        _peaks.reset(peaks_token)
+        _path.reset(token)
+        _add(record)
+
+def instrument(name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _add(record):
+    with _lock:
+        _records.append(record)
+        if METRICS_FILE:
+            with open(METRICS_FILE, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+def records(run=None):
+    with _lock:
+        selected = [record for record in _records if run is None or record["run"] == run]
+    return pd.DataFrame(selected)
+
+def to_jsonl(run=None):
+    return "".join(json.dumps(record, default=str) + "\n" for record in records(run).to_dict(orient="records"))
+
+def export_jsonl(path, run=None):
+    with open(path, "a") as f:
+        f.write(to_jsonl(run))
+
+def summary(run=None):
+    df = records(run)
+    if df.empty:
+        return df
+    return df.groupby("stage", sort=False).agg(
+        calls=("wall_s", "count"), wall_s=("wall_s", "sum"), cpu_s=("cpu_s", "sum"),
+        rows=("rows", "sum"), rss_delta_mb=("rss_delta_mb", "sum"),
+    ).reset_index()
+
+def format_summary(run=None):
+    lines = []
+    for row in summary(run).itertuples(index=False):
+        rows = f", {row.rows:,.0f} rows" if row.rows else ""
+        lines.append(f"⏱ {row.stage}: {row.wall_s:.3f}s wall, {row.cpu_s:.3f}s CPU{rows}")
+    return "\n".join(lines)
+
+class SamplingProfiler:
+    # Samples one thread's Python stack from a background thread; no tracing overhead on the sampled code
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = 0
+        self.own = Counter()
+        self.total = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.thread_id = self.thread_id or threading.get_ident()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.own[self._label(frame)] += 1
+            seen = set()
+            while frame is not None:
+                seen.add(self._label(frame))
+                frame = frame.f_back
+            self.total.update(seen)
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def report(self, top=25):
+        if not self.samples:
+            return pd.DataFrame(columns=["Function", "Own %", "Total %"])
+        rows = [
+            {"Function": label, "Own %": 100 * self.own[label] / self.samples, "Total %": 100 * count / self.samples}
+            for label, count in self.total.items()
+        ]
+        # Hot spots first; callers that only pass time through sort by their share of the total
+        return pd.DataFrame(rows).sort_values(["Own %", "Total %"], ascending=False, ignore_index=True).head(top)
+
+@contextmanager
+def profile(interval=0.005):
+    profiler = SamplingProfiler(interval).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
@@ -0,0 +1,149 @@
+import os
+import time
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+MODEL_FILE = "online_classifier.joblib"
+
+N_FEATURES = 2 ** 16
+
+# Stateless features: nothing to fit, so new descriptions never fall outside the vocabulary
+_vectorizer = HashingVectorizer(n_features=N_FEATURES, ngram_range=(1, 2), alternate_sign=False)
+
+def featurize(descriptions):
+    return _vectorizer.transform(pd.Series(descriptions, dtype=object).astype(str))
+
+class OnlineClassifier:
+    def __init__(self, model=None):
+        self.model = model or SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42)
+
+    @property
+    def classes(self):
+        return list(getattr(self.model, "classes_", []))
+
+    def _add_classes(self, labels):
+        # SGDClassifier fixes its classes on the first partial_fit; grow them for new categories
+        new = [label for label in dict.fromkeys(labels) if label not in self.classes]
+        if not new:
+            return
+        if len(self.classes) == 2:
+            # A binary model keeps one row scoring classes_[1] against classes_[0]; split it into one row per class
+            self.model.coef_ = np.vstack([-self.model.coef_, self.model.coef_])
+            self.model.intercept_ = np.concatenate([-self.model.intercept_, self.model.intercept_])
+        self.model.classes_ = np.append(self.model.classes_, new).astype(object)
+        self.model.coef_ = np.vstack([self.model.coef_, np.zeros((len(new), self.model.coef_.shape[1]))])
+        self.model.intercept_ = np.append(self.model.intercept_, np.zeros(len(new)))
+
+    def partial_fit(self, descriptions, categories, epochs=5):
+        X = featurize(descriptions)
+        y = np.asarray(categories, dtype=object)
+        if not hasattr(self.model, "classes_"):
+            self.model.partial_fit(X, y, classes=np.unique(y))
+            epochs -= 1
+        else:
+            self._add_classes(y)
+        rng = np.random.default_rng(len(y))
+        for _ in range(epochs):
+            order = rng.permutation(len(y))
+            self.model.partial_fit(X[order], y[order])
+        return self
+
+    def predict(self, descriptions):
+        return self.model.predict(featurize(descriptions))
+
+    def save(self, path=MODEL_FILE):
+        # Most hashed features never fire, so the coefficients are stored sparse
+        self.model.sparsify()
+        try:
+            joblib.dump(self.model, path, compress=3)
+        finally:
+            self.model.densify()
+
+    @classmethod
+    def load(cls, path=MODEL_FILE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ Error: '{path}' not found! Run 'online_classifier.py train' first.")
+        model = joblib.load(path)
+        model.densify()
+        return cls(model)
+
+def train(path=MODEL_FILE, epochs=20):
+    from train_classifier import TRAINING_DATA
+
+    classifier = OnlineClassifier().partial_fit(TRAINING_DATA["Description"], TRAINING_DATA["Category"], epochs)
+    classifier.save(path)
+    print(f"✅ Online classifier trained and saved to '{path}'")
+    return classifier
+
+def learn(corrections_file, path=MODEL_FILE, batch_size=256, epochs=5):
+    # corrections_file: CSV with Description and Category columns holding user-corrected labels
+    classifier = OnlineClassifier.load(path)
+    rows = 0
+    for batch in pd.read_csv(corrections_file, chunksize=batch_size):
+        classifier.partial_fit(batch["Description"], batch["Category"], epochs)
+        rows += len(batch)
+    classifier.save(path)
+    print(f"✅ Online classifier updated with {rows} corrections")
+    return classifier
+
+def _best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def benchmark(batch_size=10000, repeat=5):
+    from categorize_expenses import MODEL_FILE as FOREST_FILE, VECTORIZER_FILE
+    from train_classifier import TRAINING_DATA
+
+    descriptions = list(np.resize(TRAINING_DATA["Description"], batch_size))
+    forest = joblib.load(FOREST_FILE)
+    vectorizer = joblib.load(VECTORIZER_FILE)
+    online = OnlineClassifier.load()
+
+    rows = [
+        {
+            "Backend": "TF-IDF + RandomForest",
+            "Artifact (KB)": (os.path.getsize(FOREST_FILE) + os.path.getsize(VECTORIZER_FILE)) / 1024,
+            "Load (ms)": 1000 * _best_of(lambda: (joblib.load(FOREST_FILE), joblib.load(VECTORIZER_FILE)), repeat),
+            "Single (ms)": 1000 * _best_of(lambda: forest.predict(vectorizer.transform(descriptions[:1])), repeat),
+            f"Batch of {batch_size} (ms)": 1000 * _best_of(lambda: forest.predict(vectorizer.transform(descriptions)), repeat),
+        },
+        {
+            "Backend": "Hashing + SGD (online)",
+            "Artifact (KB)": os.path.getsize(MODEL_FILE) / 1024,
+            "Load (ms)": 1000 * _best_of(OnlineClassifier.load, repeat),
+            "Single (ms)": 1000 * _best_of(lambda: online.predict(descriptions[:1]), repeat),
+            f"Batch of {batch_size} (ms)": 1000 * _best_of(lambda: online.predict(descriptions), repeat),
+        },
+    ]
+    results = pd.DataFrame(rows).set_index("Backend")
+    print(results.round(2).to_string())
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally trainable transaction classifier.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("train", help="train from the seed data in 'train_classifier.py'")
+    learn_parser = commands.add_parser("learn", help="update the model from a CSV of corrected categories")
+    learn_parser.add_argument("corrections_file")
+    learn_parser.add_argument("--batch-size", type=int, default=256)
+    benchmark_parser = commands.add_parser("benchmark", help="compare loading and inference latency with the pickled model")
+    benchmark_parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.command == "train":
+        train()
+    elif args.command == "learn":
+        learn(args.corrections_file, batch_size=args.batch_size)
+    else:
+        benchmark(args.batch_size)
+
+if __name__ == "__main__":
+    main()
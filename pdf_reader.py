@@ -1,35 +1,130 @@
 import os
-import PyPDF2
+import io
 import re
-import streamlit as st
+import argparse
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import PyPDF2
+import pandas as pd
+import streamlit as st
+
+PAGES_PER_TASK = 8
+
+# Set once in each worker by _open_pdf, so tasks only carry their page range
+_worker_reader = None
 
-def extract_transactions_from_pdf(pdf_file):
+_TRANSACTION = re.compile(r"(\d{2}-\d{2}-\d{4})\s+(.+?)\s+(\d+\.\d+|\-)\s+(\d+\.\d+|\-)")
+
+def parse_page_text(text):
     transactions = []
-    reader = PyPDF2.PdfReader(pdf_file)
-    for page in reader.pages:
-        text = page.extract_text() or ""
-        matches = re.findall(r"(\d{2}-\d{2}-\d{4})\s+(.+?)\s+(\d+\.\d+|\-)\s+(\d+\.\d+|\-)", text)
-        for match in matches:
-            date_str, particulars, withdrawal, deposit = match
-            date_obj = datetime.strptime(date_str, "%d-%m-%Y")
-            date_formatted = date_obj.strftime("%Y-%m-%d")
-            if withdrawal != '-':
-                amount = -float(withdrawal.replace(',', ''))
-            else:
-                amount = float(deposit.replace(',', ''))
-            transactions.append((date_formatted, particulars.strip(), amount))
+    for date_str, particulars, withdrawal, deposit in _TRANSACTION.findall(text):
+        # The pattern only guarantees digits; strptime rejects dates such as 31-02-2024
+        date_formatted = datetime.strptime(date_str, "%d-%m-%Y").strftime("%Y-%m-%d")
+        if withdrawal != '-':
+            amount = -float(withdrawal.replace(',', ''))
+        else:
+            amount = float(deposit.replace(',', ''))
+        transactions.append((date_formatted, particulars.strip(), amount))
+    return transactions
+
+def _read_bytes(pdf_file):
+    if hasattr(pdf_file, "read"):
+        return pdf_file.read()
+    with open(pdf_file, "rb") as f:
+        return f.read()
+
+def _open_pdf(data):
+    # Worker initializer: the PDF bytes are sent and opened once per worker
+    global _worker_reader
+    _worker_reader = PyPDF2.PdfReader(io.BytesIO(data))
+
+def _extract_pages(start, stop):
+    return [parse_page_text(_worker_reader.pages[number].extract_text() or "") for number in range(start, stop)]
+
+def iter_pages(pdf_file, workers=None, pages_per_task=PAGES_PER_TASK):
+    # Yields (page number, page count, transactions) in page order as soon as each page is parsed
+    data = _read_bytes(pdf_file)
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+    ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+
+    if workers == 1 or len(ranges) <= 1:
+        for number, page in enumerate(reader.pages):
+            yield number, page_count, parse_page_text(page.extract_text() or "")
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_open_pdf, initargs=(data,)) as executor:
+        jobs = [executor.submit(_extract_pages, start, stop) for start, stop in ranges]
+        for (start, _), job in zip(ranges, jobs):
+            for offset, transactions in enumerate(job.result()):
+                yield start + offset, page_count, transactions
+
+def iter_transactions(pdf_file, workers=None):
+    for _, _, transactions in iter_pages(pdf_file, workers):
+        yield from transactions
+
+def extract_transactions_from_pdf(pdf_file, workers=None):
+    return list(iter_transactions(pdf_file, workers))
+
+def _extract_file(path):
+    transactions = extract_transactions_from_pdf(path, workers=1)
+    return path, pd.DataFrame(transactions, columns=["Date", "Description", "Amount"])
+
+def ingest_directory(directory, output, workers=None):
+    # One statement per worker; pages within a statement are read sequentially
+    paths = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith(".pdf")
+    )
+    if not paths:
+        raise FileNotFoundError(f"❌ Error: No PDF statements found in '{directory}'")
+
+    frames = {}
+    with ProcessPoolExecutor(workers) as executor:
+        for job in as_completed([executor.submit(_extract_file, path) for path in paths]):
+            try:
+                path, frame = job.result()
+            except Exception as error:
+                print(f"⚠ Warning: Could not read a statement: {error}")
+                continue
+            frames[path] = frame
+            print(f"📄 {os.path.basename(path)}: {len(frame)} transactions")
+
+    # Keep the directory order regardless of which statement finished first
+    transactions = pd.concat([frames[path] for path in paths if path in frames], ignore_index=True)
+    transactions.to_csv(output, index=False)
+    print(f"✅ Extracted {len(transactions)} transactions from {len(frames)} statements to '{output}'")
     return transactions
 
 def main():
+    parser = argparse.ArgumentParser(description="Extract transactions from PDF bank statements.")
+    parser.add_argument("--ingest", metavar="DIR", help="extract every PDF in DIR instead of starting the upload page")
+    parser.add_argument("--output", default="pdf_transactions.csv", help="CSV written by --ingest")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.ingest:
+        ingest_directory(args.ingest, args.output, args.workers)
+        return
+
+    import statement_ingest
+
     st.title("PDF Transaction Extractor")
     uploaded_file = st.file_uploader("Upload a PDF file", type="pdf")
     if uploaded_file is not None:
-        transactions = extract_transactions_from_pdf(uploaded_file)
-        if transactions:
+        progress = st.progress(0.0, text="Reading statement...")
+        update = lambda number, page_count: progress.progress((number + 1) / page_count, text=f"Page {number + 1} of {page_count}")
+        # Re-uploads of the same file come straight from the parse cache
+        transactions, _ = statement_ingest.parse_statement(uploaded_file.getvalue(), args.workers, update)
+        progress.empty()
+        if not transactions.empty:
             st.write("Extracted Transactions:")
-            for t in transactions:
-                st.write(t)
+            st.dataframe(transactions, hide_index=True)
+            index = statement_ingest.TransactionIndex()
+            new, fingerprints = index.new_rows(transactions)
+            st.write(f"{len(new)} new, {len(transactions) - len(new)} already in '{statement_ingest.TRANSACTIONS_FILE}'.")
+            if not new.empty and st.button(f"Add {len(new)} new transactions"):
+                index.append(new, fingerprints)
+                st.success(f"✅ Added {len(new)} transactions to '{statement_ingest.TRANSACTIONS_FILE}'")
         else:
             st.write("No transactions found in the uploaded PDF.")
 
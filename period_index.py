@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+class MonthIndex:
+    # Rows kept sorted by month for O(log n) range slicing, plus a (category, month)-sorted
+    # permutation whose per-category blocks give each (category, month) cell as an offset range
+    def __init__(self, frame, month="Month", category="Category"):
+        months = pd.PeriodIndex(frame[month], freq="M").asi8
+        order = None if _is_sorted(months) else np.argsort(months, kind="stable")
+        self.frame = frame.reset_index(drop=True) if order is None else frame.iloc[order].reset_index(drop=True)
+        self._months = months if order is None else months[order]
+        self._blocks = {}
+        self._by_category = np.arange(len(self.frame))
+        self._category_months = self._months
+        if category is not None:
+            codes, names = pd.factorize(self.frame[category])
+            # Stable on the month-sorted rows, so months stay ascending inside each category block
+            self._by_category = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[self._by_category], np.arange(len(names) + 1))
+            self._blocks = {name: (bounds[i], bounds[i + 1]) for i, name in enumerate(names)}
+            self._category_months = self._months[self._by_category]
+
+    def _bounds(self, months, lo, hi, start, end):
+        if start is not None:
+            lo += np.searchsorted(months[lo:hi], month_ordinal(start), "left")
+        if end is not None:
+            hi = lo + np.searchsorted(months[lo:hi], month_ordinal(end), "right")
+        return lo, max(lo, hi)
+
+    def range(self, start=None, end=None):
+        lo, hi = self._bounds(self._months, 0, len(self._months), start, end)
+        return self.frame.iloc[lo:hi]
+
+    def month(self, month):
+        return self.range(month, month)
+
+    def offsets(self, category, start=None, end=None):
+        # Positions into the category-sorted permutation for one category over [start, end]
+        lo, hi = self._blocks.get(category, (0, 0))
+        return self._bounds(self._category_months, lo, hi, start, end)
+
+    def category(self, category, start=None, end=None):
+        lo, hi = self.offsets(category, start, end)
+        return self.frame.iloc[self._by_category[lo:hi]]
+
+    def categories(self):
+        return list(self._blocks)
+
+    def years(self):
+        return sorted(set(pd.PeriodIndex.from_ordinals(np.unique(self._months), freq="M").year))
+
+    def __len__(self):
+        return len(self.frame)
+
+def _is_sorted(values):
+    return len(values) < 2 or bool(np.all(values[1:] >= values[:-1]))
+
+def month_ordinal(month):
+    if not isinstance(month, pd.Period):
+        month = pd.Period(month, freq="M")
+    return month.ordinal
@@ -0,0 +1,310 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+
+STATE_FILE = ".pipeline_state.json"
+# The fraud model is retrained on this schedule (or with --force fit_fraud), not on every new transaction
+FRAUD_RETRAIN_DAYS = 30
+# Reason given when the only change is new lines at the end of a stage's appendable input
+ROWS_APPENDED = "rows appended"
+
+def _train_classifier():
+    import train_classifier
+    train_classifier.train()
+
+def _train_online():
+    import online_classifier
+    online_classifier.train()
+
+def _categorize():
+    import categorize_expenses
+    categorize_expenses.categorize_all()
+
+def _categorize_appended():
+    import categorize_expenses
+    categorize_expenses.categorize_incremental()
+
+def _fit_fraud():
+    import fraud_detection
+    fraud_detection.fit()
+
+def _score_fraud():
+    import fraud_detection
+    fraud_detection.run()
+
+def _forecast():
+    import predict_expenses
+    predict_expenses.cached_forecast()
+
+def _category_forecast():
+    import batch_forecast
+    batch_forecast.forecast_all(batch_forecast.expense_series()).to_csv("category_forecasts.csv")
+
+# Dependencies follow from the paths: a stage runs after every stage that writes one of its inputs.
+# Source files are inputs too, so a code change reruns the stage.
+# Stages with adopt_existing trust outputs that already exist when there is no record of them yet,
+# so the committed classifier artifacts are not retrained on the first run.
+# "after" orders a stage behind others without their outputs making it stale, and "max_age_days"
+# reruns a stage once its last run is that old. When the "appendable" input only gained rows at its end,
+# "run_appended" runs instead of "run".
+STAGES = {
+    "train_classifier": {
+        "run": _train_classifier,
+        "inputs": ["train_classifier.py"],
+        "outputs": ["transaction_classifier.pkl", "vectorizer.pkl"],
+        "adopt_existing": True,
+    },
+    "train_online": {
+        "run": _train_online,
+        "inputs": ["train_classifier.py", "online_classifier.py"],
+        "outputs": ["online_classifier.joblib"],
+        "adopt_existing": True,
+    },
+    "categorize": {
+        "run": _categorize,
+        "inputs": ["transactions.csv", "transaction_classifier.pkl", "vectorizer.pkl", "categories.json",
+                   "categorize_expenses.py", "categorizer.py", "online_classifier.py", "categorization_service.py",
+                   "transaction_store.py", "aggregate_cube.py", "transaction_schema.py"],
+        "outputs": ["transaction_store/categorized", "transaction_store/aggregates.parquet"],
+        "appendable": "transactions.csv",
+        "run_appended": _categorize_appended,
+    },
+    "fit_fraud": {
+        "run": _fit_fraud,
+        "inputs": ["fraud_rules.json", "fraud_rules.py", "fraud_detection.py", "fraud_features.py", "transaction_store.py", "categorizer.py"],
+        "outputs": ["fraud_model.joblib"],
+        "after": ["categorize"],
+        "max_age_days": FRAUD_RETRAIN_DAYS,
+    },
+    "score_fraud": {
+        "run": _score_fraud,
+        "inputs": ["transaction_store/categorized", "fraud_model.joblib", "fraud_rules.json", "fraud_rules.py", "fraud_detection.py",
+                   "fraud_features.py", "transaction_store.py", "categorizer.py"],
+        # 'fit' may have recorded the new transactions' features already; only this stage claims the directory
+        "outputs": ["transaction_store/fraud", "transaction_store/fraud_features"],
+    },
+    "forecast": {
+        "run": _forecast,
+        "inputs": ["transaction_store/categorized", "transaction_store/aggregates.parquet", "predict_expenses.py",
+                   "aggregate_cube.py", "transaction_store.py", "transaction_schema.py"],
+        "outputs": ["transaction_store/forecasts"],
+    },
+    "category_forecast": {
+        "run": _category_forecast,
+        "inputs": ["transaction_store/categorized", "batch_forecast.py", "predict_expenses.py",
+                   "aggregate_cube.py", "transaction_store.py", "transaction_schema.py"],
+        "outputs": ["category_forecasts.csv"],
+    },
+}
+
+def dependencies(stages=STAGES):
+    producers = {output: name for name, stage in stages.items() for output in stage["outputs"]}
+    return {
+        name: sorted({producers[path] for path in stage["inputs"] if path in producers and producers[path] != name} | set(stage.get("after", [])))
+        for name, stage in stages.items()
+    }
+
+def _files(path):
+    if os.path.isdir(path):
+        for directory, subdirectories, names in os.walk(path):
+            subdirectories.sort()
+            for name in sorted(names):
+                yield os.path.join(directory, name)
+    elif os.path.exists(path):
+        yield path
+
+class ContentHasher:
+    # sha256 of files and directory trees; a file is only re-read when its size or mtime moved
+    def __init__(self, known=None):
+        self.known = known or {}
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        cached = self.known.get(path)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.known[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+        return digest.hexdigest()
+
+    def digest(self, paths):
+        digest = hashlib.sha256()
+        for path in sorted(paths):
+            digest.update(f"{path}\0".encode())
+            # Inside a directory only the subdirectory and content count, since store parts have random names
+            members = sorted(
+                (os.path.relpath(os.path.dirname(file), path), self.file_hash(file)) if os.path.isdir(path) else ("", self.file_hash(file))
+                for file in _files(path)
+            )
+            for directory, file_hash in members:
+                digest.update(f"{directory}\0{file_hash}\0".encode())
+        return digest.hexdigest()
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {"stages": {}, "files": {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_FILE):
+    with open(path, "w") as f:
+        json.dump(state, f, indent=2)
+
+def stale_reason(name, stage, state, hasher):
+    if not all(os.path.exists(output) for output in stage["outputs"]):
+        return "outputs missing"
+    recorded = state["stages"].get(name)
+    if recorded is None:
+        return None if stage.get("adopt_existing") else "never run"
+    if recorded["outputs"] != hasher.digest(stage["outputs"]):
+        return "outputs changed"
+    if recorded["inputs"] != hasher.digest(stage["inputs"]):
+        return ROWS_APPENDED if _only_appended(stage, recorded, hasher) else "inputs changed"
+    if stage.get("max_age_days") and time.time() - recorded.get("ran_at", 0) > stage["max_age_days"] * 86400:
+        return f"older than {stage['max_age_days']} days"
+    return None
+
+def _fixed_inputs(stage):
+    return [path for path in stage["inputs"] if path != stage.get("appendable")]
+
+def _only_appended(stage, recorded, hasher):
+    # The appendable input still starts with the bytes it had at the last run, which ended on a complete line,
+    # and every other input is unchanged
+    path = stage.get("appendable")
+    before = recorded.get("appendable")
+    if not before or not os.path.exists(path) or os.path.getsize(path) <= before["size"]:
+        return False
+    if recorded["fixed_inputs"] != hasher.digest(_fixed_inputs(stage)):
+        return False
+    digest = hashlib.sha256()
+    block = b""
+    with open(path, "rb") as f:
+        remaining = before["size"]
+        while remaining:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                return False
+            digest.update(block)
+            remaining -= len(block)
+    return block.endswith(b"\n") and digest.hexdigest() == before["sha256"]
+
+def _record(stage, hasher):
+    record = {"inputs": hasher.digest(stage["inputs"]), "outputs": hasher.digest(stage["outputs"]), "ran_at": time.time()}
+    path = stage.get("appendable")
+    if path and os.path.exists(path):
+        record["fixed_inputs"] = hasher.digest(_fixed_inputs(stage))
+        record["appendable"] = {"size": os.path.getsize(path), "sha256": hasher.file_hash(path)}
+    return record
+
+def _run_stage(name, reason=None):
+    start = time.perf_counter()
+    stage = STAGES[name]
+    (stage["run_appended"] if reason == ROWS_APPENDED else stage["run"])()
+    return time.perf_counter() - start
+
+def selected_stages(targets, stages=STAGES):
+    # The targets plus everything upstream of them
+    if not targets:
+        return list(stages)
+    upstream = dependencies(stages)
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(upstream[name])
+    return [name for name in stages if name in selected]
+
+def run_pipeline(targets=None, force=(), workers=None, dry_run=False):
+    state = load_state()
+    hasher = ContentHasher(state["files"])
+    names = selected_stages(targets)
+    upstream = {name: [dependency for dependency in deps if dependency in names] for name, deps in dependencies().items()}
+
+    results = {}
+    running = {}
+    done = set()
+    with ProcessPoolExecutor(workers) as executor:
+        while len(done) < len(names):
+            # Queue every stage whose upstream stages have all settled
+            for name in names:
+                if name in done or name in running.values() or not all(dependency in done for dependency in upstream[name]):
+                    continue
+                failed = [dependency for dependency in upstream[name] if results[dependency]["Status"] in ("failed", "blocked")]
+                if failed:
+                    results[name] = {"Stage": name, "Status": "blocked", "Reason": f"{', '.join(failed)} failed"}
+                    done.add(name)
+                    continue
+                reran = [dependency for dependency in upstream[name]
+                         if results[dependency]["Status"] in ("ran", "would run") and dependency not in STAGES[name].get("after", [])]
+                reason = "forced" if name in force else stale_reason(name, STAGES[name], state, hasher)
+                if dry_run and reason is None and reran:
+                    reason = f"after {', '.join(reran)}"
+                if reason is None:
+                    results[name] = {"Stage": name, "Status": "up to date", "Reason": ""}
+                    done.add(name)
+                elif dry_run:
+                    results[name] = {"Stage": name, "Status": "would run", "Reason": reason}
+                    done.add(name)
+                else:
+                    print(f"▶ {name} ({reason})", flush=True)
+                    running[executor.submit(_run_stage, name, reason)] = name
+                    results[name] = {"Stage": name, "Status": "running", "Reason": reason}
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name].update(Status="ran", Seconds=future.result())
+                    state["stages"][name] = _record(STAGES[name], hasher)
+                    save_state({**state, "files": hasher.known})
+                except Exception as error:
+                    results[name].update(Status="failed", Reason=str(error))
+                done.add(name)
+
+    # Adopted outputs get a record so later input changes are noticed
+    for name in names:
+        if results[name]["Status"] == "up to date" and name not in state["stages"]:
+            state["stages"][name] = _record(STAGES[name], hasher)
+    if not dry_run:
+        save_state({**state, "files": hasher.known})
+
+    report = pd.DataFrame([results[name] for name in names])
+    print(report.fillna("").to_string(index=False))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the stages that are out of date: training, categorization, fraud and forecasts.")
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date along with everything they need (default: all)")
+    parser.add_argument("--force", nargs="+", default=[], choices=list(STAGES), help="rerun these stages even if they are up to date")
+    parser.add_argument("--workers", type=int, default=None, help="stages run at the same time when they do not depend on each other")
+    parser.add_argument("--dry-run", action="store_true", help="only show which stages would run")
+    parser.add_argument("--graph", action="store_true", help="print each stage with the stages it depends on")
+    args = parser.parse_args()
+    unknown = [target for target in args.targets if target not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s) {', '.join(unknown)}; choose from {', '.join(STAGES)}")
+
+    if args.graph:
+        for name, upstream in dependencies().items():
+            print(f"{name} <- {', '.join(upstream) or '(sources only)'}")
+        return
+
+    report = run_pipeline(args.targets, args.force, args.workers, args.dry_run)
+    if (report["Status"] == "failed").any():
+        raise SystemExit(1)
+    if not args.dry_run:
+        print("✅ Pipeline is up to date.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import transaction_store
+import aggregate_cube
+import fraud_detection
+import fraud_rules
+import fraud_features
+from categorizer import Categorizer
+from categorize_expenses import BACKENDS, TRANSACTIONS_FILE, finalize_categories, load_artifacts, model_files
+
+# accounts/<account>/transactions.csv in, accounts/<account>/transaction_store/ and forecast.csv out
+ACCOUNTS_DIR = "accounts"
+FORECAST_FILE = "forecast.csv"
+
+_categorizer = None
+_fraud_artifact = None
+_fraud_config = None
+
+def _init_worker(backend):
+    # Runs once per process; every shard it handles reuses these
+    global _categorizer, _fraud_artifact, _fraud_config
+    # Workers keep their memo in memory so they never race on the shared cache file
+    _categorizer = Categorizer(load_artifacts(backend), cache_file=None, model_files=model_files(backend))
+    _fraud_config = fraud_rules.load_config()
+    if os.path.exists(fraud_detection.FRAUD_MODEL_FILE):
+        _fraud_artifact = fraud_detection.load_fraud_model()
+
+def list_accounts(accounts_dir=ACCOUNTS_DIR):
+    if not os.path.isdir(accounts_dir):
+        raise FileNotFoundError(f"❌ Error: '{accounts_dir}' not found! Run 'pipeline_runner.py split' first.")
+    return sorted(
+        account for account in os.listdir(accounts_dir)
+        if os.path.exists(os.path.join(accounts_dir, account, TRANSACTIONS_FILE))
+    )
+
+def split_accounts(source=TRANSACTIONS_FILE, column="Account", accounts_dir=ACCOUNTS_DIR):
+    df = pd.read_csv(source)
+    if column not in df.columns:
+        raise ValueError(f"❌ Error: '{source}' has no '{column}' column to split on")
+    for account, rows in df.groupby(column, sort=False):
+        path = os.path.join(accounts_dir, str(account))
+        os.makedirs(path, exist_ok=True)
+        rows.drop(columns=column).to_csv(os.path.join(path, TRANSACTIONS_FILE), index=False)
+    print(f"✅ Split {len(df)} transactions into {df[column].nunique()} accounts under '{accounts_dir}'")
+
+def process_account(account, accounts_dir=ACCOUNTS_DIR, forecast=True):
+    from predict_expenses import cached_forecast
+
+    path = os.path.join(accounts_dir, account)
+    root = os.path.join(path, transaction_store.STORE_ROOT)
+    timings = {}
+
+    start = time.perf_counter()
+    df = pd.read_csv(os.path.join(path, TRANSACTIONS_FILE))
+    df["Category"] = _categorizer.categorize(df["Description"])
+    df = finalize_categories(df)
+    df[transaction_store.FINGERPRINT] = transaction_store.fingerprint_transactions(df)
+    transaction_store.write_transactions(df, transaction_store.CATEGORIZED, root)
+    aggregate_cube.write_cube(df, root)
+    timings["Categorize (s)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = fraud_features.attach_features(df, root)
+    # Without a shared model each account gets an anomaly model fitted on its own history
+    artifact = _fraud_artifact or fraud_detection.fit_fraud_model(df, _fraud_config, workers=1)
+    scored = fraud_detection.FraudScorer(artifact, _fraud_config).score(df)
+    fraudulent = scored[scored["Final_Fraud"] == 1]
+    transaction_store.write_transactions(fraudulent, transaction_store.FRAUD, root)
+    timings["Fraud (s)"] = time.perf_counter() - start
+
+    status = "skipped"
+    start = time.perf_counter()
+    if forecast:
+        try:
+            cached_forecast(root)["table"].to_csv(os.path.join(path, FORECAST_FILE), index_label="Month")
+            status = "ok"
+        except ValueError:
+            status = "too little history"
+    timings["Forecast (s)"] = time.perf_counter() - start
+
+    total = sum(timings.values())
+    return {
+        "Account": account,
+        "Rows": len(df),
+        "Flagged": len(fraudulent),
+        "Forecast": status,
+        **timings,
+        "Total (s)": total,
+        "Rows/s": len(df) / total if total else 0,
+        "Worker": os.getpid(),
+    }
+
+def run_accounts(accounts=None, accounts_dir=ACCOUNTS_DIR, workers=None, backend="forest", forecast=True):
+    accounts = accounts or list_accounts(accounts_dir)
+    # Largest shards first so a big account does not start last and hold up the pool
+    accounts = sorted(accounts, key=lambda account: os.path.getsize(os.path.join(accounts_dir, account, TRANSACTIONS_FILE)), reverse=True)
+
+    start = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(backend,)) as executor:
+        jobs = {executor.submit(process_account, account, accounts_dir, forecast): account for account in accounts}
+        for job in as_completed(jobs):
+            try:
+                rows.append(job.result())
+            except Exception as error:
+                print(f"⚠ Warning: Account '{jobs[job]}' failed: {error}")
+                rows.append({"Account": jobs[job], "Error": str(error)})
+    elapsed = time.perf_counter() - start
+
+    report = pd.DataFrame(rows).sort_values("Account", ignore_index=True)
+    print(report.round(3).to_string(index=False))
+    total_rows = report["Rows"].sum() if "Rows" in report else 0
+    print(f"✅ Processed {len(accounts)} accounts, {total_rows:.0f} transactions in {elapsed:.2f}s ({total_rows / elapsed:,.0f} rows/s)")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Run categorize -> fraud -> forecast for every account on a process pool.")
+    parser.add_argument("--accounts-dir", default=ACCOUNTS_DIR)
+    commands = parser.add_subparsers(dest="command")
+    run_parser = commands.add_parser("run", help="process every account (default)")
+    run_parser.add_argument("--accounts", nargs="+", help="only these accounts")
+    run_parser.add_argument("--workers", type=int, default=None)
+    run_parser.add_argument("--backend", choices=BACKENDS, default="forest")
+    run_parser.add_argument("--no-forecast", action="store_true")
+    run_parser.add_argument("--report", help="also write the per-account report to this CSV")
+    split_parser = commands.add_parser("split", help="partition a CSV with an account column into per-account folders")
+    split_parser.add_argument("source", nargs="?", default=TRANSACTIONS_FILE)
+    split_parser.add_argument("--column", default="Account")
+    args = parser.parse_args()
+
+    if args.command == "split":
+        split_accounts(args.source, args.column, args.accounts_dir)
+        return
+
+    report = run_accounts(
+        getattr(args, "accounts", None), args.accounts_dir, getattr(args, "workers", None),
+        getattr(args, "backend", "forest"), not getattr(args, "no_forecast", False),
+    )
+    if getattr(args, "report", None):
+        report.to_csv(args.report, index=False)
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,154 @@
 import os
+import json
+import hashlib
+import io
+import joblib
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import xgboost as xgb
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error
-
-def run_expense_prediction():
-    file_path = "categorized_transactions.csv"
-    if not os.path.exists(file_path):
-        raise FileNotFoundError("❌ Error: 'categorized_transactions.csv' not found! Run 'categorize_expenses.py' first.")
-
-    df = pd.read_csv(file_path)
-
-    df["Date"] = pd.to_datetime(df["Date"])
-    df.set_index("Date", inplace=True)
-
-    monthly_expenses = df[df["Amount"] < 0].groupby(pd.Grouper(freq="M"))["Amount"].sum().abs().to_frame()
-    monthly_expenses.rename(columns={"Amount": "Expense"}, inplace=True)
-
+import transaction_store
+import aggregate_cube
+import instrumentation
+from resources import get_resource
+
+# Trained forecasts live next to the store, keyed by the monthly series they were fitted on
+FORECAST_DIR = "forecasts"
+KEEP_FORECASTS = 10
+
+HYPERPARAMETERS = {"lags": 3, "horizon": 3, "n_estimators": 100, "learning_rate": 0.1}
+
+def monthly_expense_series(root=transaction_store.STORE_ROOT):
+    if not transaction_store.has_dataset(transaction_store.CATEGORIZED, root):
+        raise FileNotFoundError("❌ Error: Categorized transactions not found! Run 'categorize_expenses.py' first.")
+
+    # The cube already holds the monthly totals, so no transactions are read; summed in cents as the store is
+    spending = aggregate_cube.monthly_spending(aggregate_cube.load_cube(root))
+    month_codes = pd.PeriodIndex(spending["Month"], freq="M").asi8
+    cents = (spending["Amount"] * 100).round().astype("int64").groupby(month_codes).sum()
+    # Every month between the first and last expense, empty months as 0, indexed by month end
+    ordinals = np.arange(cents.index.min(), cents.index.max() + 1) if len(cents) else np.array([], dtype="int64")
+    cents = cents.reindex(ordinals, fill_value=0)
+    months = pd.PeriodIndex.from_ordinals(ordinals, freq="M")
+    index = pd.DatetimeIndex(months.to_timestamp(how="end").normalize(), name="Date")
+    return pd.DataFrame({"Expense": np.abs(cents.to_numpy()) / 100}, index=index)
+
+def series_fingerprint(monthly_expenses, params=HYPERPARAMETERS):
+    digest = hashlib.sha256()
+    digest.update(monthly_expenses.index.asi8.tobytes())
+    digest.update(monthly_expenses["Expense"].to_numpy(dtype="float64").tobytes())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+def train_forecast(monthly_expenses, params=HYPERPARAMETERS):
+    import xgboost as xgb
+    from sklearn.metrics import mean_absolute_error
+
+    lags, horizon = params["lags"], params["horizon"]
     if len(monthly_expenses) < 12:
         raise ValueError("❌ Error: Not enough data for ML forecasting. At least 12 months of data required.")
 
-    for i in range(1, 4):  # Use past 3 months as features
+    monthly_expenses = monthly_expenses.copy()
+    for i in range(1, lags + 1):  # Use past months as features
         monthly_expenses[f"lag_{i}"] = monthly_expenses["Expense"].shift(i)
 
     monthly_expenses.dropna(inplace=True)
 
-    train_data = monthly_expenses[:-3]
-    test_data = monthly_expenses[-3:]
+    train_data = monthly_expenses[:-horizon]
+    test_data = monthly_expenses[-horizon:]
 
     X_train, y_train = train_data.drop(columns=["Expense"]), train_data["Expense"]
     X_test, y_test = test_data.drop(columns=["Expense"]), test_data["Expense"]
 
     # Train XGBoost model
-    model = xgb.XGBRegressor(objective="reg:squarederror", n_estimators=100, learning_rate=0.1)
+    model = xgb.XGBRegressor(objective="reg:squarederror", n_estimators=params["n_estimators"], learning_rate=params["learning_rate"])
     model.fit(X_train, y_train)
 
-    # Predict next 3 months
+    # Predict the holdout months
     predictions = model.predict(X_test)
 
     mae = mean_absolute_error(y_test, predictions)
-    print(f"📊 Model MAE: {mae:.2f}")
 
-    future_dates = pd.date_range(start=monthly_expenses.index[-1] + pd.DateOffset(months=1), periods=3, freq='M')
+    future_dates = pd.date_range(start=monthly_expenses.index[-1] + pd.DateOffset(months=1), periods=horizon, freq='M')
     future_expenses = pd.DataFrame(index=future_dates, columns=["Expense"])
 
     last_known = monthly_expenses.iloc[-1].drop("Expense")
 
-    for i in range(3):
+    for i in range(horizon):
         pred = model.predict(np.array(last_known).reshape(1, -1))[0]
         future_expenses.iloc[i] = pred
         last_known = last_known.shift(1)
         last_known.iloc[0] = pred
 
-    # Plot results
-    plt.figure(figsize=(12, 6))
-    plt.plot(monthly_expenses.index[-12:], monthly_expenses["Expense"][-12:], label="Past Expenses", marker='o')
-    plt.plot(future_expenses.index, future_expenses["Expense"], label="Predicted Expenses", linestyle="dashed", marker='x')
-
-    plt.legend()
-    plt.title("ML-Based Expense Forecast")
-    plt.xlabel("Date")
-    plt.ylabel("Amount ($)")
-    plt.grid(True)
-    
-    fig = plt.gcf()
-    plt.close(fig)
-    
-    combined_expenses = pd.concat([monthly_expenses[["Expense"]][-3:], future_expenses], axis=0)
+    combined_expenses = pd.concat([monthly_expenses[["Expense"]][-horizon:], future_expenses], axis=0)
 
     combined_expenses.index = combined_expenses.index.strftime('%m-%Y')
 
-    return fig, combined_expenses
\ No newline at end of file
+    return {"model": model, "mae": mae, "future": future_expenses, "table": combined_expenses}
+
+def render_forecast(monthly_expenses, future_expenses):
+    # A bare Figure keeps no pyplot state, so forecasts can render off the main thread
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    ax.plot(monthly_expenses.index[-12:], monthly_expenses["Expense"][-12:], label="Past Expenses", marker='o')
+    ax.plot(future_expenses.index, future_expenses["Expense"], label="Predicted Expenses", linestyle="dashed", marker='x')
+
+    ax.legend()
+    ax.set_title("ML-Based Expense Forecast")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Amount ($)")
+    ax.grid(True)
+    return fig
+
+def _forecast_paths(fingerprint, root):
+    directory = os.path.join(root, FORECAST_DIR)
+    return os.path.join(directory, f"{fingerprint}.joblib"), os.path.join(directory, f"{fingerprint}.model.joblib")
+
+def _prune(root, keep=KEEP_FORECASTS):
+    directory = os.path.join(root, FORECAST_DIR)
+    results = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if not name.endswith(".model.joblib")),
+        key=os.path.getmtime, reverse=True,
+    )
+    for path in results[keep:]:
+        for stale in (path, path.replace(".joblib", ".model.joblib")):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+def _load_or_train(monthly_expenses, fingerprint, params, root):
+    result_path, model_path = _forecast_paths(fingerprint, root)
+    if os.path.exists(result_path):
+        return {**joblib.load(result_path), "cached": True}
+
+    with instrumentation.stage("fit", rows=len(monthly_expenses)):
+        trained = train_forecast(monthly_expenses, params)
+    with instrumentation.stage("render"):
+        fig = render_forecast(monthly_expenses, trained["future"])
+        png = io.BytesIO()
+        fig.savefig(png, format="png")
+
+    # The model is stored on its own so showing a cached forecast never has to import xgboost
+    result = {"fingerprint": fingerprint, "params": params, "mae": trained["mae"],
+              "future": trained["future"], "table": trained["table"], "png": png.getvalue()}
+    os.makedirs(os.path.dirname(result_path), exist_ok=True)
+    joblib.dump(trained["model"], model_path)
+    joblib.dump(result, result_path)
+    _prune(root)
+    print(f"📊 Model MAE: {trained['mae']:.2f}")
+    return {**result, "cached": False}
+
+def cached_forecast(root=transaction_store.STORE_ROOT, params=HYPERPARAMETERS):
+    # Retrains only when the monthly series or the hyperparameters change
+    with instrumentation.stage("expense_series"):
+        monthly_expenses = monthly_expense_series(root)
+    fingerprint = series_fingerprint(monthly_expenses, params)
+    return get_resource(f"forecast {root}", lambda: _load_or_train(monthly_expenses, fingerprint, params, root), fingerprint)
+
+def load_forecast_model(fingerprint, root=transaction_store.STORE_ROOT):
+    return joblib.load(_forecast_paths(fingerprint, root)[1])
+
+def run_expense_prediction(root=transaction_store.STORE_ROOT):
+    monthly_expenses = monthly_expense_series(root)
+    trained = train_forecast(monthly_expenses)
+    print(f"📊 Model MAE: {trained['mae']:.2f}")
+    return render_forecast(monthly_expenses, trained["future"]), trained["table"]
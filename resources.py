@@ -0,0 +1,88 @@
+import time
+import threading
+import importlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Process-wide cache for heavy modules and model artifacts; Streamlit reruns share it.
+# One entry per name: loading a new version of a name replaces the old one, and the least
+# recently used names are dropped beyond MAX_ENTRIES.
+MAX_ENTRIES = 64
+MAX_WORKERS = 4
+
+_resources = OrderedDict()  # name -> (version, value)
+_load_times = {}
+_pending = {}  # (name, version) -> Future
+_lock = threading.Lock()
+_executor = None
+
+def _pool():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="resources")
+        return _executor
+
+def _cached(name, version):
+    # Caller holds _lock
+    entry = _resources.get(name)
+    if entry is None or entry[0] != version:
+        return False
+    _resources.move_to_end(name)
+    return True
+
+def _load(name, version, loader, future):
+    start = time.perf_counter()
+    try:
+        value = loader()
+    except BaseException as error:
+        # A failed load is not cached; the next request tries again
+        with _lock:
+            _pending.pop((name, version), None)
+        future.set_exception(error)
+        return
+    with _lock:
+        _resources[name] = (version, value)
+        _resources.move_to_end(name)
+        while len(_resources) > MAX_ENTRIES:
+            evicted, _ = _resources.popitem(last=False)
+            _load_times.pop(evicted, None)
+        _load_times[name] = time.perf_counter() - start
+        _pending.pop((name, version), None)
+    future.set_result(value)
+
+def get_resource(name, loader, version=None):
+    with _lock:
+        if _cached(name, version):
+            return _resources[name][1]
+        # Joins a load already running for this version, e.g. a prefetch, instead of starting another
+        future = _pending.get((name, version))
+        owner = future is None
+        if owner:
+            future = _pending[(name, version)] = Future()
+    if owner:
+        _load(name, version, loader, future)
+    return future.result()
+
+def prefetch(name, loader, version=None):
+    # Starts loading in the background; get_resource(name, ..., version) later returns or waits for it
+    with _lock:
+        if _cached(name, version) or (name, version) in _pending:
+            return
+        future = _pending[(name, version)] = Future()
+    _pool().submit(_load, name, version, loader, future)
+
+def submit(function, *args):
+    # Uncached work on the same pool, for loads that should overlap
+    return _pool().submit(function, *args)
+
+def lazy_import(module_name):
+    return get_resource(f"import {module_name}", lambda: importlib.import_module(module_name))
+
+def load_times():
+    return dict(_load_times)
+
+def clear():
+    with _lock:
+        _resources.clear()
+        _load_times.clear()
@@ -0,0 +1,96 @@
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+import pandas as pd
+
+PAGES = ["Overview", "Spending vs Budget", "Compare Spending", "Category-wise Spending", "Spending Trends", "Category Comparison", "Predict Expenses", "Suggestions"]
+
+# Runs one cold dashboard render of a page inside `python -X importtime`
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+import resources
+at = AppTest.from_file("dashboard.py", default_timeout=300)
+at.session_state["page_select"] = sys.argv[1]
+at.run()
+print(json.dumps({
+    "wall": time.perf_counter() - start,
+    "error": at.exception[0].message if at.exception else None,
+    "resources": resources.load_times(),
+}))
+"""
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+def parse_importtime(stderr):
+    # Cumulative import cost (seconds) per top-level package
+    costs = {}
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match and not match.group(3):
+            package = match.group(4).split(".")[0]
+            costs[package] = costs.get(package, 0) + int(match.group(2)) / 1e6
+    return costs
+
+def measure_page(page):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, page],
+        capture_output=True, text=True, env={**os.environ, "PYTHONWARNINGS": "ignore"},
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    probe["imports"] = parse_importtime(result.stderr)
+    return probe
+
+def startup_report(pages=PAGES, top=8):
+    rows = []
+    for page in pages:
+        probe = measure_page(page)
+        imports = sorted(probe["imports"].items(), key=lambda item: item[1], reverse=True)
+        rows.append({
+            "Page": page,
+            "Wall (s)": probe["wall"],
+            "Imports (s)": sum(probe["imports"].values()),
+            "Top imports": ", ".join(f"{name} {seconds:.2f}s" for name, seconds in imports[:top]),
+            "Lazy loads": ", ".join(f"{name} {seconds:.2f}s" for name, seconds in probe["resources"].items()),
+            "Error": probe["error"],
+            "imports": probe["imports"],
+        })
+    return rows
+
+def compare(rows, baseline, tolerance):
+    regressions = []
+    previous = {row["Page"]: row for row in baseline}
+    for row in rows:
+        old = previous.get(row["Page"])
+        if old and row["Wall (s)"] > old["Wall (s)"] * (1 + tolerance):
+            regressions.append(f"{row['Page']}: {old['Wall (s)']:.2f}s -> {row['Wall (s)']:.2f}s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import and load cost of each dashboard page.")
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="compare with a report written earlier with --json")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    rows = startup_report(args.pages)
+    print(pd.DataFrame(rows).drop(columns="imports").round(2).to_string(index=False))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(rows, json.load(f), args.tolerance)
+        if regressions:
+            print("⚠ Startup regressions:\n" + "\n".join(regressions))
+            sys.exit(1)
+        print("✅ No startup regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
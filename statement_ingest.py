@@ -0,0 +1,162 @@
+import os
+import io
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import transaction_store
+import pdf_reader
+
+TRANSACTIONS_FILE = "transactions.csv"
+CACHE_DIR = "statement_cache"
+INDEX_FILE = os.path.join(CACHE_DIR, "transaction_index.npz")
+
+COLUMNS = ["Date", "Description", "Amount"]
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def _cache_path(digest):
+    return os.path.join(CACHE_DIR, f"{digest}.parquet")
+
+def parse_statement(data, workers=None, progress=None):
+    # Parsed statements are cached by content, so re-uploads never touch the PDF again.
+    # progress(page number, page count) is called while an uncached statement is parsed.
+    digest = content_hash(data)
+    path = _cache_path(digest)
+    if os.path.exists(path):
+        return pd.read_parquet(path), True
+
+    transactions = []
+    for number, page_count, page_transactions in pdf_reader.iter_pages(io.BytesIO(data), workers):
+        transactions.extend(page_transactions)
+        if progress:
+            progress(number, page_count)
+    df = pd.DataFrame(transactions, columns=COLUMNS)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    df.to_parquet(path, index=False)
+    return df, False
+
+def _parse_file(path):
+    with open(path, "rb") as f:
+        parse_statement(f.read(), workers=1)
+    return path
+
+class TransactionIndex:
+    # Sorted fingerprints of every row in transactions.csv, rebuilt only when the file changes behind its back
+    def __init__(self, transactions_file=TRANSACTIONS_FILE, index_file=INDEX_FILE):
+        self.transactions_file = transactions_file
+        self.index_file = index_file
+        self.fingerprints = None
+        if os.path.exists(index_file):
+            saved = np.load(index_file)
+            if saved["signature"].tolist() == self._signature():
+                self.fingerprints = saved["fingerprints"]
+        if self.fingerprints is None:
+            self.rebuild()
+
+    def _signature(self):
+        if not os.path.exists(self.transactions_file):
+            return [0, 0]
+        stat = os.stat(self.transactions_file)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def rebuild(self, chunk_size=100000):
+        fingerprints = []
+        if os.path.exists(self.transactions_file):
+            seen_counts = {}
+            for chunk in pd.read_csv(self.transactions_file, chunksize=chunk_size):
+                fingerprints.append(transaction_store.fingerprint_transactions(chunk, seen_counts))
+        self.fingerprints = np.sort(np.concatenate(fingerprints)) if fingerprints else np.array([], dtype="uint64")
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+        with open(self.index_file, "wb") as f:
+            np.savez(f, fingerprints=self.fingerprints, signature=np.array(self._signature(), dtype="int64"))
+
+    def contains(self, fingerprints):
+        positions = np.searchsorted(self.fingerprints, fingerprints)
+        found = np.zeros(len(fingerprints), dtype=bool)
+        inside = positions < len(self.fingerprints)
+        found[inside] = self.fingerprints[positions[inside]] == fingerprints[inside]
+        return found
+
+    def new_rows(self, df):
+        # Occurrences are numbered within the statement, so a transaction that appears twice on one day
+        # is only new when the statement has more copies of it than the history already holds
+        fingerprints = transaction_store.fingerprint_transactions(df)
+        new = ~self.contains(fingerprints)
+        return df[new], fingerprints[new]
+
+    def append(self, df, fingerprints):
+        header = not os.path.exists(self.transactions_file) or os.path.getsize(self.transactions_file) == 0
+        df[COLUMNS].to_csv(self.transactions_file, mode="a", header=header, index=False)
+        self.fingerprints = np.sort(np.concatenate([self.fingerprints, fingerprints]))
+        self.save()
+
+def ingest_statement(data, name="statement", index=None, workers=None, progress=None, dry_run=False):
+    start = time.perf_counter()
+    index = index or TransactionIndex()
+    df, cached = parse_statement(data, workers, progress)
+    new, fingerprints = index.new_rows(df)
+    if not dry_run and not new.empty:
+        index.append(new, fingerprints)
+    return {
+        "Statement": name,
+        "Parsed": len(df),
+        "New": len(new),
+        "Duplicates": len(df) - len(new),
+        "Cached": cached,
+        "Seconds": time.perf_counter() - start,
+    }
+
+def list_statements(paths):
+    statements = []
+    for path in paths:
+        if os.path.isdir(path):
+            statements.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.lower().endswith(".pdf"))
+        else:
+            statements.append(path)
+    return statements
+
+def ingest_paths(paths, workers=None, dry_run=False):
+    paths = list_statements(paths)
+    if not paths:
+        raise FileNotFoundError("❌ Error: No PDF statements found!")
+
+    contents = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            contents[path] = f.read()
+
+    # Parse every statement not seen before concurrently; deduplication below stays in statement order
+    uncached = [path for path in paths if not os.path.exists(_cache_path(content_hash(contents[path])))]
+    if len(uncached) > 1 and workers != 1:
+        with ProcessPoolExecutor(workers) as executor:
+            list(executor.map(_parse_file, uncached))
+
+    index = TransactionIndex()
+    rows = [ingest_statement(contents[path], os.path.basename(path), index, workers, dry_run=dry_run) for path in paths]
+    report = pd.DataFrame(rows)
+    print(report.round(3).to_string(index=False))
+    action = "would be appended" if dry_run else f"appended to '{TRANSACTIONS_FILE}'"
+    print(f"✅ {report['New'].sum()} new of {report['Parsed'].sum()} transactions {action}")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Add PDF statements to 'transactions.csv', skipping transactions already there.")
+    parser.add_argument("paths", nargs="+", help="PDF files or directories of PDFs")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="report new and duplicate rows without appending")
+    parser.add_argument("--rebuild-index", action="store_true", help=f"recompute the fingerprint index from '{TRANSACTIONS_FILE}' first")
+    args = parser.parse_args()
+
+    if args.rebuild_index:
+        TransactionIndex().rebuild()
+    ingest_paths(args.paths, args.workers, args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+# category -> (description, typical amount, spread of log amount, relative frequency)
+CATALOG = {
+    "Shopping": [("Amazon Purchase", 60, 0.9, 5), ("AMAZON MKTPLACE PMTS", 45, 0.8, 3), ("Target", 55, 0.7, 2), ("Best Buy", 180, 0.9, 1), ("IKEA", 150, 0.8, 1)],
+    "Food & Dining": [("Starbucks", 6, 0.4, 6), ("McDonald's", 12, 0.4, 4), ("Chipotle", 14, 0.3, 2), ("Pizza Hut", 25, 0.4, 2), ("Local Cafe", 10, 0.5, 2)],
+    "Auto & Transport": [("Uber Ride", 18, 0.6, 5), ("Lyft Ride", 16, 0.6, 2), ("Shell Gas", 45, 0.3, 3), ("Car Repair", 600, 0.6, 1), ("Parking Meter", 5, 0.5, 2)],
+    "Groceries": [("Grocery Shopping", 80, 0.5, 5), ("Whole Foods", 70, 0.5, 2), ("Trader Joe's", 55, 0.4, 2), ("Costco", 160, 0.5, 1)],
+    "Housing": [("Rent Payment", 1500, 0.05, 2), ("Electric Bill", 90, 0.3, 1), ("Water Utility", 40, 0.3, 1), ("Internet Service", 60, 0.1, 1)],
+    "Income": [("Salary", 3000, 0.15, 3), ("Interest Payment", 20, 0.5, 1)],
+}
+
+def merchant_table(merchants=200, seed=0):
+    # Each catalog entry is split into store-numbered variants until there are about `merchants` descriptions
+    rng = np.random.default_rng(seed)
+    rows = [
+        (category, name, typical, spread, weight)
+        for category, entries in CATALOG.items()
+        for name, typical, spread, weight in entries
+    ]
+    variants = max(1, merchants // len(rows))
+    table = []
+    for category, name, typical, spread, weight in rows:
+        # Zipf-like popularity across the variants of one merchant
+        shares = 1 / np.arange(1, variants + 1)
+        shares = shares / shares.sum()
+        for k, share in enumerate(shares):
+            description = name if k == 0 or category in ("Housing", "Income") else f"{name} #{rng.integers(1000, 9999)}"
+            table.append((description, category, typical, spread, weight * share))
+    table = pd.DataFrame(table, columns=["Description", "Category", "Typical", "Spread", "Weight"])
+    return table.drop_duplicates("Description", ignore_index=True)
+
+def generate_transactions(rows, accounts=1, years=2, merchants=200, noise=0.1, anomalies=0.002, start="2023-01-01", seed=0, with_category=False):
+    rng = np.random.default_rng(seed)
+    table = merchant_table(merchants, seed)
+
+    picks = rng.choice(len(table), size=rows, p=(table["Weight"] / table["Weight"].sum()).to_numpy())
+    days = pd.date_range(start, periods=365 * years, freq="D").to_numpy()
+    dates = np.sort(days[rng.integers(0, len(days), rows)])
+
+    amounts = table["Typical"].to_numpy()[picks] * rng.lognormal(0, table["Spread"].to_numpy()[picks])
+    # Rare outliers for the fraud detector to find
+    outliers = rng.random(rows) < anomalies
+    amounts[outliers] *= rng.uniform(10, 40, outliers.sum())
+    income = (table["Category"].to_numpy() == "Income")[picks]
+    amounts = np.round(np.where(income, amounts, -amounts), 2)
+
+    descriptions = table["Description"].to_numpy(dtype=object)[picks]
+    # Card-terminal style references ("UBER RIDE *4821") that only the normalizer can map back
+    noisy = np.flatnonzero(rng.random(rows) < noise)
+    references = rng.integers(1000, 99999, len(noisy))
+    descriptions[noisy] = [f"{description.upper()} *{reference}" for description, reference in zip(descriptions[noisy], references)]
+
+    df = pd.DataFrame({
+        "Date": pd.DatetimeIndex(dates).strftime("%Y-%m-%d"),
+        "Description": descriptions,
+        "Amount": amounts,
+    })
+    if with_category:
+        df["Category"] = table["Category"].to_numpy(dtype=object)[picks]
+    if accounts > 1:
+        df["Account"] = np.char.add("acct_", np.char.zfill(rng.integers(0, accounts, rows).astype(str), 3))
+    return df
+
+def generate_budgets(df, headroom=(0.85, 1.25), seed=0):
+    # Month x expense category budgets around the median month actually spent; df needs the true Category
+    rng = np.random.default_rng(seed)
+    expenses = df[(df["Amount"] < 0) & (df["Category"] != "Income")]
+    spent = expenses.groupby([pd.to_datetime(expenses["Date"]).dt.to_period("M"), "Category"])["Amount"].sum().abs()
+    budgets = spent.groupby(level="Category").transform("median") * rng.uniform(*headroom, len(spent))
+    budgets = budgets.round(-1).astype("int64").rename("Budget").reset_index()
+    budgets.columns = ["Month", "Category", "Budget"]
+    budgets["Month"] = budgets["Month"].astype(str)
+    return budgets
+
+def write_dataset(directory, rows, accounts=1, years=2, merchants=200, seed=0):
+    os.makedirs(directory, exist_ok=True)
+    df = generate_transactions(rows, accounts, years, merchants, seed=seed, with_category=True)
+    generate_budgets(df, seed=seed).to_csv(os.path.join(directory, "budgets.csv"), index=False)
+    df = df.drop(columns="Category")
+    df.to_csv(os.path.join(directory, "transactions.csv"), index=False)
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic 'transactions.csv' and matching 'budgets.csv'.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--accounts", type=int, default=1, help="adds an Account column when more than 1; budgets cover all accounts")
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--merchants", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="synthetic")
+    args = parser.parse_args()
+
+    df = write_dataset(args.output_dir, args.rows, args.accounts, args.years, args.merchants, args.seed)
+    print(f"✅ Wrote {len(df)} transactions and budgets to '{args.output_dir}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+import aggregate_cube
+
+TRANSACTIONS = pd.DataFrame({
+    "Date": pd.to_datetime(["2024-01-05", "2024-01-20", "2024-02-03", "2024-02-10", "2024-03-15"]),
+    "Description": ["Coffee", "Salary", "Rent Payment", "Coffee", "Grocery Shopping"],
+    "Amount": [-4.5, 3000.0, -1200.0, -3.25, -86.25],
+    "Category": ["Food", "Salary", "Housing", "Food", "Food"],
+})
+
+def cells(cube):
+    return cube.assign(Month=cube["Month"].astype(str)).sort_values(aggregate_cube.KEYS, ignore_index=True)
+
+def test_replace_months_recomputes_only_the_given_months(tmp_path):
+    root = str(tmp_path)
+    aggregate_cube.write_cube(TRANSACTIONS, root)
+    february = pd.DataFrame({
+        "Date": pd.to_datetime(["2024-02-03", "2024-02-28"]),
+        "Amount": [-1000.0, -20.0],
+        "Category": ["Housing", "Transport"],
+    })
+    cube = aggregate_cube.replace_months(february, root)
+
+    expected = aggregate_cube.summarize(pd.concat([TRANSACTIONS[TRANSACTIONS["Date"].dt.month != 2], february]))
+    pd.testing.assert_frame_equal(cells(cube), cells(expected))
+    # Food in February is gone: the new rows replace the whole month
+    assert not ((cube["Month"] == pd.Period("2024-02", freq="M")) & (cube["Category"] == "Food")).any()
+
+def test_add_transactions_merges_into_existing_cells(tmp_path):
+    root = str(tmp_path)
+    aggregate_cube.write_cube(TRANSACTIONS.iloc[:3], root)
+    cube = aggregate_cube.add_transactions(TRANSACTIONS.iloc[3:], root)
+
+    pd.testing.assert_frame_equal(cells(cube), cells(aggregate_cube.summarize(TRANSACTIONS)))
+    food = cube[(cube["Category"] == "Food") & (cube["Month"] == pd.Period("2024-01", freq="M"))].iloc[0]
+    assert food["Count"] == 1
+    assert food["Sum"] == pytest.approx(-4.5)
+
+def test_cube_round_trips_through_parquet(tmp_path):
+    root = str(tmp_path)
+    written = aggregate_cube.write_cube(TRANSACTIONS, root)
+    pd.testing.assert_frame_equal(cells(aggregate_cube.load_cube(root)), cells(written))
@@ -0,0 +1,30 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from urllib import request as urlrequest
+from urllib.error import HTTPError
+import pytest
+import categorization_service
+
+@pytest.fixture
+def url():
+    batcher = categorization_service.MicroBatcher(lambda descriptions: ["Food"] * len(descriptions))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), categorization_service.make_handler(batcher))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def post(url, payload):
+    req = urlrequest.Request(f"{url}/categorize", data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"})
+    try:
+        with urlrequest.urlopen(req) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as error:
+        return error.code, json.loads(error.read())
+
+def test_descriptions_list_is_categorized(url):
+    assert post(url, {"descriptions": ["Coffee", "Rent"]}) == (200, {"categories": ["Food", "Food"]})
+
+@pytest.mark.parametrize("payload", [{"descriptions": "Coffee"}, {"descriptions": [1, 2]}, {"description": ["Coffee"]}, ["Coffee"]])
+def test_malformed_descriptions_are_rejected(url, payload):
+    assert post(url, payload)[0] == 400
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+import aggregate_cube
+import categorize_expenses
+import transaction_store
+
+TRANSACTIONS = pd.DataFrame({
+    "Date": ["2024-01-05", "2024-01-05", "2024-01-20", "2024-02-03", "2024-02-03", "2024-03-15"],
+    "Description": ["Coffee", "Coffee", "Salary", "Rent Payment", "Coffee", "Grocery Shopping"],
+    "Amount": [-4.5, -4.5, 3000.0, -1200.0, -4.5, -86.25],
+})
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Every description gets the same category; no model files are needed
+    monkeypatch.setattr(categorize_expenses, "load_artifacts",
+                        lambda backend="forest": lambda descriptions: np.array(["Food"] * len(descriptions), dtype=object))
+    TRANSACTIONS.to_csv(categorize_expenses.TRANSACTIONS_FILE, index=False)
+    return tmp_path
+
+def test_incremental_into_empty_store_counts_each_row_once(workdir):
+    categorize_expenses.categorize_incremental(chunk_size=2, workers=1, use_cache=False)
+
+    stored = transaction_store.read_transactions(transaction_store.CATEGORIZED)
+    cube = aggregate_cube.load_cube()
+    assert len(stored) == len(TRANSACTIONS)
+    assert cube["Count"].sum() == len(TRANSACTIONS)
+    assert cube["Sum"].sum() == pytest.approx(TRANSACTIONS["Amount"].sum())
+
+def test_incremental_rerun_appends_nothing_and_matches_full_fingerprints(workdir):
+    categorize_expenses.categorize_incremental(chunk_size=2, workers=1, use_cache=False)
+    categorize_expenses.categorize_incremental(chunk_size=4, workers=1, use_cache=False)
+
+    stored = transaction_store.read_transactions(transaction_store.CATEGORIZED)
+    assert len(stored) == len(TRANSACTIONS)
+    # Per-month occurrence counts give the same ids as fingerprinting the whole file at once
+    expected = transaction_store.fingerprint_transactions(TRANSACTIONS)
+    assert sorted(stored[transaction_store.FINGERPRINT]) == sorted(expected)
+    assert aggregate_cube.load_cube()["Count"].sum() == len(TRANSACTIONS)
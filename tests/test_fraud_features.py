@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import fraud_features
+
+def transactions(days, description="Coffee Shop"):
+    return pd.DataFrame({
+        "Date": pd.to_datetime("2024-01-01") + pd.to_timedelta(days, unit="D"),
+        "Description": description,
+        "Amount": -10.0,
+        "Transaction_ID": np.arange(len(days)) + days[0] * 1000,
+    })
+
+def test_parts_are_compacted_and_reload_the_same_features(tmp_path):
+    for run in range(fraud_features.MAX_PARTS + 3):
+        fraud_features.attach_features(transactions([run * 2, run * 2 + 1]), str(tmp_path))
+
+    store = fraud_features.FeatureStore(str(tmp_path))
+    assert len(store.parts()) <= fraud_features.MAX_PARTS
+    assert len(store.known) == 2 * (fraud_features.MAX_PARTS + 3)
+    assert store.known.is_unique
+
+def test_backfilled_rows_leave_the_spend_windows_alone(tmp_path):
+    store = fraud_features.FeatureStore(str(tmp_path))
+    store.update(["2024-03-10"], [-100.0], ["Grocery"])
+    velocity = list(store.velocity)
+
+    features = store.update(["2024-01-01"], [-500.0], ["Grocery"])
+    assert store.velocity == velocity
+    assert (features[0, 2:] == 0).all()
+
+def test_rows_without_description_share_no_merchant(tmp_path):
+    store = fraud_features.FeatureStore(str(tmp_path))
+    features = store.update(["2024-01-01", "2024-01-02"], [-5.0, -5000.0], [None, None])
+    assert store.merchants == {}
+    assert (features[:, :2] == 0).all()
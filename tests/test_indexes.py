@@ -0,0 +1,64 @@
+import pandas as pd
+from budget_index import BudgetIndex
+from period_index import MonthIndex
+
+# Deliberately out of month order
+SPENDING = pd.DataFrame({
+    "Month": pd.PeriodIndex(["2024-03", "2024-01", "2024-02", "2024-01", "2024-05", "2024-03"], freq="M"),
+    "Category": ["Food", "Food", "Housing", "Housing", "Food", "Housing"],
+    "Amount": [-30.0, -10.0, -200.0, -100.0, -50.0, -300.0],
+})
+
+def months(frame):
+    return [str(month) for month in frame["Month"]]
+
+def test_month_index_range_bounds_are_inclusive():
+    index = MonthIndex(SPENDING)
+    assert months(index.range("2024-01", "2024-03")) == ["2024-01", "2024-01", "2024-02", "2024-03", "2024-03"]
+    assert months(index.range(pd.Period("2024-03", freq="M"))) == ["2024-03", "2024-03", "2024-05"]
+    assert months(index.range(end="2024-01")) == ["2024-01", "2024-01"]
+    assert len(index.range()) == len(SPENDING)
+
+def test_month_index_empty_ranges():
+    index = MonthIndex(SPENDING)
+    assert index.month("2024-04").empty
+    assert index.range("2025-01", "2025-12").empty
+    assert index.range("2023-01", "2023-12").empty
+    # A start after the end is empty rather than an error
+    assert index.range("2024-05", "2024-01").empty
+
+def test_month_index_category_slices():
+    index = MonthIndex(SPENDING)
+    assert list(index.category("Food")["Amount"]) == [-10.0, -30.0, -50.0]
+    assert list(index.category("Housing", "2024-02", "2024-03")["Amount"]) == [-200.0, -300.0]
+    assert index.category("Food", "2024-04", "2024-04").empty
+    assert index.category("Transport").empty
+    assert index.offsets("Transport") == (0, 0)
+    assert sorted(index.categories()) == ["Food", "Housing"]
+    assert index.years() == [2024]
+
+def test_month_index_without_category():
+    index = MonthIndex(SPENDING[["Month", "Amount"]], category=None)
+    assert months(index.month("2024-01")) == ["2024-01", "2024-01"]
+    assert index.categories() == []
+
+BUDGETS = pd.DataFrame({
+    "Month": ["2024-03", "2024-01", "2024-02", "2024-01"],
+    "Category": ["Food", "Food", "Food", "Housing"],
+    "Budget": [300, 100, 200, 1000],
+})
+
+def test_budget_index_range_is_inclusive_and_sorted():
+    budgets = BudgetIndex(BUDGETS)
+    assert budgets.range("Food", "2024-01", "2024-02") == [(pd.Period("2024-01", freq="M"), 100), (pd.Period("2024-02", freq="M"), 200)]
+    assert [budget for _, budget in budgets.range("Food", "2023-01", "2025-12")] == [100, 200, 300]
+    assert budgets.range("Food", "2024-04", "2024-12") == []
+    assert budgets.range("Transport", "2024-01", "2024-12") == []
+
+def test_budget_index_set_keeps_range_order():
+    budgets = BudgetIndex(BUDGETS)
+    budgets.set("2023-12", "Food", 50)
+    budgets.set("2024-02", "Food", 250)
+    assert [budget for _, budget in budgets.range("Food", "2023-01", "2024-12")] == [50, 100, 250, 300]
+    assert budgets.get(pd.Period("2024-02", freq="M"), "Food") == 250
+    assert len(budgets) == 5
@@ -0,0 +1,19 @@
+import tracemalloc
+import instrumentation
+
+def test_nested_stage_keeps_the_enclosing_peak():
+    tracemalloc.start()
+    try:
+        run = instrumentation.start_run("test")
+        with instrumentation.stage("outer"):
+            block = bytearray(20 * 2 ** 20)
+            del block
+            with instrumentation.stage("inner"):
+                block = bytearray(2 * 2 ** 20)
+                del block
+    finally:
+        tracemalloc.stop()
+
+    peaks = instrumentation.records(run).set_index("stage")["peak_traced_mb"]
+    assert peaks["outer"] >= 20
+    assert 2 <= peaks["outer/inner"] < 20
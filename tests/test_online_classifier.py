@@ -0,0 +1,19 @@
+from online_classifier import OnlineClassifier
+
+def test_binary_model_learns_a_third_class():
+    classifier = OnlineClassifier().partial_fit(["Coffee Shop", "Salary Deposit"] * 5, ["Food", "Income"] * 5)
+    before = classifier.predict(["Coffee Shop", "Salary Deposit"])
+
+    classifier.partial_fit(["Rent Payment", "Coffee Shop", "Salary Deposit"] * 5, ["Housing", "Food", "Income"] * 5)
+
+    assert classifier.classes == ["Food", "Income", "Housing"]
+    assert classifier.model.coef_.shape[0] == 3
+    assert list(before) == ["Food", "Income"]
+    assert list(classifier.predict(["Coffee Shop", "Salary Deposit", "Rent Payment"])) == ["Food", "Income", "Housing"]
+
+def test_binary_split_keeps_predictions():
+    classifier = OnlineClassifier().partial_fit(["Coffee Shop", "Salary Deposit"] * 5, ["Food", "Income"] * 5)
+    descriptions = ["Coffee Shop", "Salary Deposit", "Coffee Salary"]
+    before = classifier.predict(descriptions)
+    classifier._add_classes(["Housing"])
+    assert list(classifier.predict(descriptions)) == list(before)
@@ -0,0 +1,84 @@
+import os
+import time
+import pytest
+import pipeline
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("input.csv", "w") as f:
+        f.write("Date,Amount\n2024-01-05,-4.5\n")
+    with open("code.py", "w") as f:
+        f.write("VALUE = 1\n")
+    os.makedirs("out")
+    with open("out/part.txt", "w") as f:
+        f.write("result\n")
+    return tmp_path
+
+STAGE = {"inputs": ["input.csv", "code.py"], "outputs": ["out"], "appendable": "input.csv"}
+
+def recorded(stage=STAGE):
+    hasher = pipeline.ContentHasher()
+    return {"stages": {"stage": pipeline._record(stage, hasher)}, "files": {}}
+
+def reason(state, stage=STAGE):
+    # A fresh hasher each time, as a new pipeline run would have
+    return pipeline.stale_reason("stage", stage, state, pipeline.ContentHasher())
+
+def touch(path, text, mode="a"):
+    with open(path, mode) as f:
+        f.write(text)
+    # Make sure the size/mtime check sees the edit even within one timestamp tick
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+def test_never_run_and_up_to_date(workdir):
+    assert reason({"stages": {}, "files": {}}) == "never run"
+    assert reason({"stages": {}, "files": {}}, {**STAGE, "adopt_existing": True}) is None
+    assert reason(recorded()) is None
+
+def test_appended_rows_only(workdir):
+    state = recorded()
+    touch("input.csv", "2024-01-06,-3.0\n")
+    assert reason(state) == pipeline.ROWS_APPENDED
+
+def test_edited_rows_are_a_full_change(workdir):
+    state = recorded()
+    touch("input.csv", "Date,Amount\n2024-01-05,-9.9\n2024-01-06,-3.0\n", mode="w")
+    assert reason(state) == "inputs changed"
+
+def test_append_with_other_input_changed(workdir):
+    state = recorded()
+    touch("input.csv", "2024-01-06,-3.0\n")
+    touch("code.py", "VALUE = 2\n")
+    assert reason(state) == "inputs changed"
+
+def test_last_line_without_newline_is_not_an_append(workdir):
+    touch("input.csv", "Date,Amount\n2024-01-05,-4.5", mode="w")
+    state = recorded()
+    touch("input.csv", "0\n")
+    assert reason(state) == "inputs changed"
+
+def test_outputs_missing_or_changed(workdir):
+    state = recorded()
+    touch("out/part.txt", "edited\n")
+    assert reason(state) == "outputs changed"
+    os.remove("out/part.txt")
+    os.rmdir("out")
+    assert reason(state) == "outputs missing"
+
+def test_max_age_reruns_an_unchanged_stage(workdir):
+    stage = {**STAGE, "max_age_days": 30}
+    state = recorded(stage)
+    assert reason(state, stage) is None
+    state["stages"]["stage"]["ran_at"] -= 31 * 86400
+    assert reason(state, stage) == "older than 30 days"
+
+def test_after_orders_without_making_stale():
+    stages = {
+        "produce": {"inputs": [], "outputs": ["data"]},
+        "fit": {"inputs": ["code.py"], "outputs": ["model"], "after": ["produce"]},
+        "score": {"inputs": ["data", "model"], "outputs": ["scores"]},
+    }
+    assert pipeline.dependencies(stages) == {"produce": [], "fit": ["produce"], "score": ["fit", "produce"]}
+    assert pipeline.selected_stages(["fit"], stages) == ["produce", "fit"]
+    assert pipeline.selected_stages(["produce"], stages) == ["produce"]
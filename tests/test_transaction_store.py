@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import transaction_store
+
+TRANSACTIONS = pd.DataFrame({
+    "Date": ["2024-01-05", "2024-01-05", "2024-01-05", "2024-01-20", "2024-02-03", "2024-02-03"],
+    "Description": ["Coffee", "Coffee", "Coffee ", "Salary", "Rent Payment", "Rent Payment"],
+    "Amount": [-4.5, -4.5, -4.5, 3000.0, -1200.0, -1200.0],
+})
+
+def test_repeated_transactions_get_distinct_fingerprints():
+    fingerprints = transaction_store.fingerprint_transactions(TRANSACTIONS)
+    # Identical rows are told apart by their occurrence, trailing spaces do not make a new transaction
+    assert len(set(fingerprints)) == len(TRANSACTIONS)
+
+def test_seen_counts_across_chunks_match_one_pass():
+    seen_counts = {}
+    chunked = np.concatenate([
+        transaction_store.fingerprint_transactions(TRANSACTIONS.iloc[start:start + 2], seen_counts)
+        for start in range(0, len(TRANSACTIONS), 2)
+    ])
+    assert list(chunked) == list(transaction_store.fingerprint_transactions(TRANSACTIONS))
+
+def test_seen_counts_recognise_rows_already_stored():
+    seen_counts = {}
+    stored = transaction_store.fingerprint_transactions(TRANSACTIONS.iloc[:2], seen_counts)
+    # The third Coffee is a new occurrence, not one of the two already counted
+    later = transaction_store.fingerprint_transactions(TRANSACTIONS.iloc[:3], {})
+    assert list(later[:2]) == list(stored)
+    assert later[2] not in set(stored)
+
+def test_read_fingerprints_of_parts_written_without_them(tmp_path):
+    root = str(tmp_path)
+    transaction_store.append_transactions(TRANSACTIONS.iloc[:3], transaction_store.CATEGORIZED, root)
+    transaction_store.append_transactions(TRANSACTIONS.iloc[3:], transaction_store.CATEGORIZED, root)
+    stored = transaction_store.read_fingerprints(transaction_store.CATEGORIZED, root)
+    assert sorted(stored) == sorted(transaction_store.fingerprint_transactions(TRANSACTIONS))
@@ -3,7 +3,10 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 import joblib
 
-data = {
+MODEL_FILE = "transaction_classifier.pkl"
+VECTORIZER_FILE = "vectorizer.pkl"
+
+TRAINING_DATA = {
     "Description": [
         "Amazon Purchase", "Uber Ride", "McDonald's", "Salary", "Rent Payment", "Grocery Shopping",
         "Starbucks Coffee", "Car Repair", "Gym Membership", "Netflix Subscription",
@@ -26,16 +29,20 @@ data = {
     ]
 }
 
-df = pd.DataFrame(data)
+def train():
+    df = pd.DataFrame(TRAINING_DATA)
+
+    vectorizer = TfidfVectorizer()
+    X = vectorizer.fit_transform(df["Description"])
+    y = df["Category"]
 
-vectorizer = TfidfVectorizer()
-X = vectorizer.fit_transform(df["Description"])
-y = df["Category"]
+    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model.fit(X, y)
 
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X, y)
+    joblib.dump(model, MODEL_FILE)
+    joblib.dump(vectorizer, VECTORIZER_FILE)
 
-joblib.dump(model, "transaction_classifier.pkl")
-joblib.dump(vectorizer, "vectorizer.pkl")
+    print("✅ Model trained and saved with a larger dataset!")
 
-print("✅ Model trained and saved with a larger dataset!")
+if __name__ == "__main__":
+    train()
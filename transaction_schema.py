@@ -0,0 +1,106 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import transaction_store
+from categorizer import normalize_description
+
+INCOME_CATEGORIES = ["Salary", "Income"]
+CATEGORY_ALIASES = {"Transport": "Auto & Transport"}
+
+# Compact rows: dictionary-encoded text, integer cents and date codes.
+# DayCode and MonthCode are the pandas Period ordinals for "D" and "M" (days and months since 1970-01).
+SCHEMA = {
+    "DayCode": "int32",
+    "MonthCode": "int16",
+    "Description": "category",
+    "Merchant": "category",
+    "Category": "category",
+    "Cents": "int32",
+    "Income": "bool",
+}
+
+def _categorical(values):
+    return values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category")
+
+def to_compact(df):
+    # df: Date and Amount, with Description and/or Category when present
+    compact = pd.DataFrame(index=df.index)
+    days = pd.to_datetime(df["Date"]).to_numpy(dtype="datetime64[D]").astype("int64")
+    compact["DayCode"] = days.astype("int32")
+    # Month ordinal straight from the day number, without building Periods
+    compact["MonthCode"] = days.astype("datetime64[D]").astype("datetime64[M]").astype("int16")
+
+    if "Description" in df.columns:
+        descriptions = _categorical(df["Description"].astype(str).str.strip())
+        compact["Description"] = descriptions
+        # Normalizing the dictionary, not the rows: "UBER *RIDE 8841" and "Uber Ride" share a merchant
+        merchant_codes, merchants = pd.factorize(descriptions.cat.categories.map(normalize_description))
+        compact["Merchant"] = pd.Categorical.from_codes(merchant_codes[descriptions.cat.codes], merchants)
+
+    if "Category" in df.columns:
+        categories = _categorical(df["Category"].astype("string").fillna("Uncategorized").astype(str))
+        aliases = {old: new for old, new in CATEGORY_ALIASES.items() if old in categories.cat.categories}
+        if aliases:
+            categories = categories.astype(str).replace(aliases).astype("category")
+        compact["Category"] = categories
+        compact["Income"] = categories.isin(INCOME_CATEGORIES).to_numpy()
+
+    cents = np.round(df["Amount"].to_numpy(dtype="float64") * 100)
+    compact["Cents"] = cents.astype("int32" if np.abs(cents).max(initial=0) < 2 ** 31 else "int64")
+    return compact
+
+def read_compact(dataset=transaction_store.CATEGORIZED, months=None, columns=("Date", "Description", "Amount", "Category"),
+                 start=None, end=None, root=transaction_store.STORE_ROOT):
+    df = transaction_store.read_transactions(dataset, months, list(columns), start, end, root)
+    return to_compact(df)
+
+def dates(compact):
+    return pd.to_datetime(compact["DayCode"].to_numpy().astype("datetime64[D]"))
+
+def periods(compact):
+    return pd.PeriodIndex.from_ordinals(compact["MonthCode"].to_numpy(), freq="M")
+
+def amounts(compact):
+    return compact["Cents"].to_numpy() / 100
+
+def bytes_per_row(df):
+    return df.memory_usage(index=False, deep=True).sum() / max(len(df), 1)
+
+def compare(dataset=transaction_store.CATEGORIZED, root=transaction_store.STORE_ROOT, repeat=5):
+    # Memory and a Month x Category spending groupby on the default and the compact representation
+    def best(fn):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    wide = transaction_store.read_transactions(dataset, columns=["Date", "Description", "Amount", "Category"], root=root)
+    compact = to_compact(wide)
+
+    def wide_groupby():
+        expenses = wide[~wide["Category"].replace(CATEGORY_ALIASES).isin(INCOME_CATEGORIES)]
+        return expenses.groupby([expenses["Date"].dt.to_period("M"), "Category"])["Amount"].sum()
+
+    def compact_groupby():
+        expenses = compact[~compact["Income"]]
+        return expenses.groupby(["MonthCode", "Category"], observed=True)["Cents"].sum()
+
+    results = pd.DataFrame([
+        {"Representation": "store dtypes", "Bytes/row": bytes_per_row(wide), "Month x Category (ms)": 1000 * best(wide_groupby)},
+        {"Representation": "compact", "Bytes/row": bytes_per_row(compact), "Month x Category (ms)": 1000 * best(compact_groupby)},
+    ]).set_index("Representation")
+    print(f"{len(wide)} rows")
+    print(results.round(2).to_string())
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory and groupby speed of the compact transaction schema.")
+    parser.add_argument("--root", default=transaction_store.STORE_ROOT)
+    args = parser.parse_args()
+    compare(root=args.root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import os
+import shutil
+import uuid
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Month-partitioned Parquet store: <root>/<dataset>/month=YYYY-MM/part-*.parquet
+STORE_ROOT = "transaction_store"
+
+CATEGORIZED = "categorized"
+FRAUD = "fraud"
+
+# CSV files the store replaces; imported once by 'transaction_store.py migrate'
+LEGACY_CSV = {
+    CATEGORIZED: "categorized_transactions.csv",
+    FRAUD: "fraud_transactions.csv",
+}
+MIGRATION_MARKER = ".legacy_csv_imported"
+
+FINGERPRINT = "Fingerprint"
+
+COLUMN_TYPES = {
+    "Description": "string",
+    "Amount": "float64",
+    "Category": "string",
+}
+
+def dataset_path(dataset, root=STORE_ROOT):
+    return os.path.join(root, dataset)
+
+def partition_path(dataset, month, root=STORE_ROOT):
+    return os.path.join(dataset_path(dataset, root), f"month={pd.Period(month, freq='M')}")
+
+def has_dataset(dataset, root=STORE_ROOT):
+    return bool(list_months(dataset, root))
+
+def list_months(dataset, root=STORE_ROOT):
+    path = dataset_path(dataset, root)
+    if not os.path.isdir(path):
+        return []
+    months = []
+    for name in os.listdir(path):
+        if name.startswith("month=") and _part_files(os.path.join(path, name)):
+            months.append(pd.Period(name[len("month="):], freq="M"))
+    return sorted(months)
+
+def _part_files(partition):
+    if not os.path.isdir(partition):
+        return []
+    return sorted(
+        os.path.join(partition, name) for name in os.listdir(partition)
+        if name.endswith(".parquet")
+    )
+
+def migrate_legacy_csv(root=STORE_ROOT):
+    # One-time import of the legacy CSVs into empty datasets; the marker file keeps it from running again
+    marker = os.path.join(root, MIGRATION_MARKER)
+    if os.path.exists(marker):
+        return []
+    imported = []
+    for dataset, csv_file in LEGACY_CSV.items():
+        if os.path.exists(csv_file) and not has_dataset(dataset, root):
+            write_transactions(pd.read_csv(csv_file), dataset, root)
+            imported.append(dataset)
+    os.makedirs(root, exist_ok=True)
+    open(marker, "w").close()
+    return imported
+
+def _apply_types(df):
+    df = df.copy()
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"]).astype("datetime64[ns]")
+    for column, dtype in COLUMN_TYPES.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    return df
+
+def _write_partitions(df, dataset, root, replace):
+    df = _apply_types(df)
+    months = df["Date"].dt.to_period("M")
+    touched = []
+    for month, part in df.groupby(months, sort=True):
+        partition = partition_path(dataset, month, root)
+        if replace:
+            for old_file in _part_files(partition):
+                os.remove(old_file)
+        os.makedirs(partition, exist_ok=True)
+        part.reset_index(drop=True).to_parquet(
+            os.path.join(partition, f"part-{uuid.uuid4().hex}.parquet"), index=False
+        )
+        touched.append(month)
+    return touched
+
+def write_transactions(df, dataset, root=STORE_ROOT):
+    # Replace the whole dataset
+    shutil.rmtree(dataset_path(dataset, root), ignore_errors=True)
+    return _write_partitions(df, dataset, root, replace=True)
+
+def write_months(df, dataset, root=STORE_ROOT):
+    # Replace only the months present in df; other partitions are left untouched
+    return _write_partitions(df, dataset, root, replace=True)
+
+def append_transactions(df, dataset, root=STORE_ROOT):
+    # Add a new part file per month without rewriting existing ones
+    return _write_partitions(df, dataset, root, replace=False)
+
+def read_transactions(dataset, months=None, columns=None, start=None, end=None, root=STORE_ROOT):
+    available = list_months(dataset, root)
+
+    if months is not None:
+        wanted = {pd.Period(month, freq="M") for month in months}
+        available = [month for month in available if month in wanted]
+    if start is not None:
+        available = [month for month in available if month >= pd.Period(start, freq="M")]
+    if end is not None:
+        available = [month for month in available if month <= pd.Period(end, freq="M")]
+
+    files = [
+        part_file
+        for month in available
+        for part_file in _part_files(partition_path(dataset, month, root))
+    ]
+    if not files:
+        return _apply_types(pd.DataFrame(columns=columns or ["Date", "Description", "Amount", "Category"]))
+
+    frames = [pd.read_parquet(part_file, columns=columns) for part_file in files]
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    return _apply_types(df)
+
+def fingerprint_transactions(df, seen_counts=None):
+    # Stable id per transaction: hash of (date, description, amount, occurrence of that triple so far).
+    # seen_counts carries occurrence counts across chunks of the same input.
+    keys = pd.util.hash_pandas_object(pd.DataFrame({
+        "Date": pd.to_datetime(df["Date"]).dt.strftime("%Y-%m-%d").to_numpy(),
+        "Description": df["Description"].astype(str).str.strip().to_numpy(),
+        "Amount": df["Amount"].astype("float64").round(2).to_numpy(),
+    }), index=False).to_numpy()
+    sequence = pd.Series(keys).groupby(keys).cumcount().to_numpy()
+    if seen_counts is not None:
+        sequence = sequence + np.fromiter((seen_counts.get(key, 0) for key in keys), dtype="int64", count=len(keys))
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique_keys.tolist(), counts.tolist()):
+            seen_counts[key] = seen_counts.get(key, 0) + count
+    return pd.util.hash_pandas_object(
+        pd.DataFrame({"Key": keys, "Sequence": sequence}), index=False
+    ).to_numpy()
+
+def read_fingerprints(dataset, root=STORE_ROOT):
+    # Fingerprints of every stored transaction; computed for parts written without them
+    fingerprints = []
+    for month in list_months(dataset, root):
+        counts = {}
+        for part_file in _part_files(partition_path(dataset, month, root)):
+            if FINGERPRINT in pq.read_schema(part_file).names:
+                fingerprints.append(pd.read_parquet(part_file, columns=[FINGERPRINT])[FINGERPRINT].to_numpy())
+            else:
+                part = pd.read_parquet(part_file, columns=["Date", "Description", "Amount"])
+                fingerprints.append(fingerprint_transactions(part, counts))
+    if not fingerprints:
+        return np.array([], dtype="uint64")
+    return np.concatenate(fingerprints)
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the month-partitioned transaction store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help=f"import {', '.join(LEGACY_CSV.values())} into the store once")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        if os.path.exists(os.path.join(STORE_ROOT, MIGRATION_MARKER)):
+            print("✅ Legacy CSV files were already imported.")
+            return
+        imported = migrate_legacy_csv()
+        print(f"✅ Imported {', '.join(imported) or 'nothing'} into '{STORE_ROOT}'")
+
+if __name__ == "__main__":
+    main()